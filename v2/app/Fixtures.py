@@ -4,7 +4,7 @@ from utils import api_get
 def show_fixtures():
     st.subheader("📅 Fixtures (Upcoming)")
     try:
-        data = api_get("/matches", {"offset": 0})
+        data = api_get("/matches", {"offset": 0}, priority="fixtures")
         rows = []
         for m in data.get("data", []):
             status = (m.get("status") or "").lower()
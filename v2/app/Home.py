@@ -1,5 +1,6 @@
 import streamlit as st
-from utils import auto_refresh, header
+from utils import auto_refresh, header, setting
+from startup import prewarm
 
 # =======================================
 # ⚙️ PAGE CONFIGURATION
@@ -31,13 +32,13 @@ with col2:
 
 # Enable auto-refresh only on Live/Fixtures pages and only if toggle is ON
 if st.session_state.auto_refresh_on and page in ["live", "fixtures"]:
-    auto_refresh()
+    auto_refresh(page)
 
 # =======================================
 # 🏠 MAIN NAVIGATION BUTTONS
 # =======================================
 st.markdown("<br>", unsafe_allow_html=True)
-c1, c2, c3, c4, c5 = st.columns(5)
+c1, c2, c3, c4, c5, c6 = st.columns(6)
 
 with c1:
     if st.button("🏏 Live"):
@@ -54,6 +55,9 @@ with c4:
 with c5:
     if st.button("📊 U-19 Analytics"):
         set_page("u19")
+with c6:
+    if st.button("🔎 Search"):
+        set_page("search")
 
 # =======================================
 # 📄 PAGE ROUTING
@@ -78,6 +82,10 @@ elif page == "u19":
     from U19_Analytics import show_u19_analytics
     show_u19_analytics()
 
+elif page == "search":
+    from Search import show_search
+    show_search()
+
 else:
     st.markdown(
         """
@@ -111,3 +119,9 @@ st.markdown(
     """,
     unsafe_allow_html=True,
 )
+
+# =======================================
+# 🔥 PRE-WARM HEAVY IMPORTS (after first paint)
+# =======================================
+if setting("PREWARM_IMPORTS", "1") != "0":
+    prewarm()
@@ -1,72 +1,167 @@
 import streamlit as st
-from datetime import datetime, timedelta
-from utils import api_get, GOLD, NAVY
+from datetime import datetime, timedelta, timezone
+from utils import api_get, scheduler, GOLD, NAVY, GREY
+from events import EventStream, event_stream
+from archive import Replay, archive_enabled, snapshot_archive
+from name_index import search_index
+
+FEED_SIZE = 8
+EVENT_ICONS = {"score": "🏏", "wicket": "☝️", "status": "📣", "innings": "🔄"}
+
+def _card_markdown(m: dict) -> str:
+    teams = f"{m.get('teamInfo', [{}])[0].get('name', '')} vs {m.get('teamInfo', [{}])[-1].get('name', '')}"
+    lines = [
+        f"### 🏏 {teams}",
+        f"📍 **Venue:** {m.get('venue', 'N/A')}",
+        f"🕒 **Status:** {m.get('status', 'No update')}",
+        f"📅 **Date:** {m.get('dateTimeGMT', 'N/A')}",
+    ]
+    if m.get("matchType"):
+        lines.append(f"🏷 **Format:** {m['matchType'].upper()}")
+
+    score_data = m.get("score", [])
+    if score_data:
+        for s in score_data:
+            team = s.get("inning", "")
+            runs = s.get("r", "")
+            wickets = s.get("w", "")
+            overs = s.get("o", "")
+            lines.append(f"**{team}:** {runs}/{wickets} ({overs} ov)")
+    else:
+        lines.append(f"<span style='color:{GREY};font-size:14px;'>⏳ Waiting for score updates…</span>")
+    return "\n\n".join(lines)
+
+REPLAY_SPEEDS = [1, 5, 10, 30, 60]
+REPLAY_TICK = 2  # seconds between replay frames
+
+def _render(matches, now: datetime, stream, seen_key: str):
+    today = now.date()
+    yesterday = today - timedelta(days=1)
+    filtered = []
+    for m in matches:
+        try:
+            date_str = m.get("dateTimeGMT", "")
+            if not date_str:
+                continue
+            match_date = datetime.strptime(date_str[:10], "%Y-%m-%d").date()
+            if match_date >= yesterday and m.get("status"):
+                filtered.append(m)
+        except Exception:
+            continue
+
+    if not filtered:
+        st.info("No live or recent matches available today.")
+        return
+
+    # ---------- GOLD TICKER BAR ----------
+    ticker_text = " | ".join([
+        f"{m.get('teams', [''])[0]} vs {m.get('teams', ['',''])[1]} – {m.get('status', '')}"
+        for m in filtered
+    ])
+    st.markdown(f"""
+    <div style='background:{GOLD};color:{NAVY};
+                padding:6px 0;border-radius:6px;
+                font-weight:600;white-space:nowrap;
+                overflow:hidden;'>
+        <marquee behavior="scroll" direction="left" scrollamount="6">{ticker_text}</marquee>
+    </div><br>
+    """, unsafe_allow_html=True)
+    # -------------------------------------
+
+    # ---------- LATEST EVENTS ----------
+    stream.ingest(matches, ts=now.timestamp())
+    seen = st.session_state.get(seen_key)
+    changed = stream.changed_since(seen) if seen is not None else set()
+    feed = stream.since(0, limit=FEED_SIZE)
+    if feed:
+        st.markdown(f"<h4 style='color:{NAVY};'>🔔 Latest events</h4>", unsafe_allow_html=True)
+        st.markdown("\n".join(
+            f"- {EVENT_ICONS.get(e['kind'], '•')} **{e['match']}**: {e['text']} "
+            f"<span style='color:{GREY};font-size:12px;'>({datetime.fromtimestamp(e['ts'], timezone.utc):%H:%M} GMT)</span>"
+            for e in feed
+        ), unsafe_allow_html=True)
+    st.session_state[seen_key] = stream.seq
+    # -------------------------------------
+
+    # ---------- MATCH CARDS ----------
+    for m in filtered:
+        st.markdown("---")
+        if m.get("id") in changed:
+            st.markdown(f"<span style='background:{GOLD};color:{NAVY};padding:2px 8px;"
+                        f"border-radius:6px;font-weight:600;'>🆕 Updated</span>", unsafe_allow_html=True)
+        st.markdown(_card_markdown(m), unsafe_allow_html=True)
+
+# ====== Replay ======
+@st.fragment(run_every=REPLAY_TICK)
+def _replay_frame():
+    r = st.session_state.live_replay
+    now_ts = r["replay"].now()
+    snap = snapshot_archive().at(now_ts)
+    if snap is None:
+        st.info("No readable snapshot archived before this point of the replay.")
+        return
+    snap_ts, matches = snap
+    now = datetime.fromtimestamp(now_ts, timezone.utc)
+    st.caption(f"⏪ Replay at {r['replay'].speed}x • {now:%Y-%m-%d %H:%M:%S} GMT "
+               f"(snapshot {datetime.fromtimestamp(snap_ts, timezone.utc):%H:%M:%S})")
+    _render(matches, now, r["stream"], "replay_seen_seq")
+
+def _replay_controls():
+    """Replay state for this session, or None when showing live data."""
+    archive = snapshot_archive()
+    span = archive.span()
+    with st.expander("⏪ Replay archived snapshots"):
+        if span is None:
+            st.caption("No snapshots archived yet.")
+            return None
+        first, last = (datetime.fromtimestamp(t, timezone.utc).replace(microsecond=0) for t in span)
+        st.caption(f"{len(archive)} snapshots • {first:%Y-%m-%d %H:%M} → {last:%Y-%m-%d %H:%M} GMT")
+        on = st.toggle("Replay instead of live data", key="live_replay_on")
+        start = st.slider("Start at", min_value=first, max_value=max(last, first + timedelta(minutes=1)),
+                          value=first, step=timedelta(minutes=1), format="YYYY-MM-DD HH:mm",
+                          key="live_replay_start")
+        speed = st.select_slider("Speed", REPLAY_SPEEDS, value=10, format_func=lambda x: f"{x}x",
+                                 key="live_replay_speed")
+    if not on:
+        return None
+    # the slider drops sub-second precision, so "first" can fall just before the first snapshot
+    start_ts = max(start.timestamp(), span[0])
+    r = st.session_state.get("live_replay")
+    if r is None or r["settings"] != (start_ts, speed):
+        # (re)start: fresh clock and event stream so events follow the replayed timeline
+        r = {"settings": (start_ts, speed), "replay": Replay(start_ts, speed), "stream": EventStream()}
+        st.session_state.live_replay = r
+        st.session_state.pop("replay_seen_seq", None)
+    return r
 
 def show_live():
     st.markdown(f"<h3 style='color:{GOLD};'>🔴 Live & Recent Matches</h3>", unsafe_allow_html=True)
 
+    if _replay_controls() is not None:
+        _replay_frame()
+        return
+
     try:
-        data = api_get("/matches", {"offset": "0"})
+        data = api_get("/matches", {"offset": "0"}, priority="live")
+        quota = scheduler().status()
+        if quota["remaining"] is not None:
+            st.markdown(
+                f"<div style='color:{GREY};font-size:13px;'>API budget: {quota['hits_today']}/{quota['hits_limit']} hits today"
+                f" • refreshing every {int(scheduler().interval('live'))}s</div>",
+                unsafe_allow_html=True,
+            )
         matches = data.get("data", [])
         if not matches:
             st.info("No match data found from API.")
             return
-
-        today = datetime.utcnow().date()
-        yesterday = today - timedelta(days=1)
-        filtered = []
-        for m in matches:
+        search_index().add_matches(matches)
+        if archive_enabled():
             try:
-                date_str = m.get("dateTimeGMT", "")
-                if not date_str:
-                    continue
-                match_date = datetime.strptime(date_str[:10], "%Y-%m-%d").date()
-                if match_date >= yesterday and m.get("status"):
-                    filtered.append(m)
-            except Exception:
-                continue
-
-        if not filtered:
-            st.info("No live or recent matches available today.")
-            return
+                snapshot_archive().append(matches)
+            except OSError:
+                pass  # archiving is best effort; it must never break the live view
 
-        # ---------- GOLD TICKER BAR ----------
-        ticker_text = " | ".join([
-            f"{m.get('teams', [''])[0]} vs {m.get('teams', ['',''])[1]} – {m.get('status', '')}"
-            for m in filtered
-        ])
-        st.markdown(f"""
-        <div style='background:{GOLD};color:{NAVY};
-                    padding:6px 0;border-radius:6px;
-                    font-weight:600;white-space:nowrap;
-                    overflow:hidden;'>
-            <marquee behavior="scroll" direction="left" scrollamount="6">{ticker_text}</marquee>
-        </div><br>
-        """, unsafe_allow_html=True)
-        # -------------------------------------
-
-        # ---------- MATCH CARDS ----------
-        for m in filtered:
-            st.markdown("---")
-            teams = f"{m.get('teamInfo', [{}])[0].get('name', '')} vs {m.get('teamInfo', [{}])[-1].get('name', '')}"
-            st.markdown(f"### 🏏 {teams}")
-
-            st.write(f"📍 **Venue:** {m.get('venue', 'N/A')}")
-            st.write(f"🕒 **Status:** {m.get('status', 'No update')}")
-            st.write(f"📅 **Date:** {m.get('dateTimeGMT', 'N/A')}")
-            if m.get("matchType"):
-                st.write(f"🏷 **Format:** {m['matchType'].upper()}")
-
-            score_data = m.get("score", [])
-            if score_data:
-                for s in score_data:
-                    team = s.get("inning", "")
-                    runs = s.get("r", "")
-                    wickets = s.get("w", "")
-                    overs = s.get("o", "")
-                    st.markdown(f"**{team}:** {runs}/{wickets} ({overs} ov)")
-            else:
-                st.caption("⏳ Waiting for score updates…")
+        _render(matches, datetime.now(timezone.utc), event_stream(), "live_seen_seq")
 
     except Exception as e:
         st.error(f"⚠️ Unable to fetch live data: {e}")
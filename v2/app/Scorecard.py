@@ -1,15 +1,90 @@
 import streamlit as st, pandas as pd
-from utils import api_get
+from concurrent.futures import ThreadPoolExecutor
+from utils import api_get, scheduler
+from name_index import search_index
 
-def show_scorecard():
-    st.subheader("📋 Scorecard")
-    match_id = st.text_input("Enter Match ID")
+MAX_WORKERS = 6        # concurrent /match_info fetches in compare mode
+COLS_PER_ROW = 3
+
+# ====== Fetch ======
+def fetch_match_infos(ids, workers: int = MAX_WORKERS) -> dict:
+    """Fetch /match_info for every id concurrently; values are payloads or the raised error."""
+    sched = scheduler()  # resolved here: worker threads have no Streamlit context
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(ids)))) as pool:
+        futures = {mid: pool.submit(sched.request, "/match_info", {"id": mid}, "scorecard") for mid in ids}
+    out = {}
+    for mid, fut in futures.items():
+        try:
+            payload = fut.result()
+            if payload.get("status", "success") != "success":
+                raise RuntimeError(payload.get("reason") or "request failed")  # e.g. an unknown id
+            out[mid] = payload.get("data", {}) or {}
+        except Exception as e:
+            out[mid] = e
+    return out
+
+# ====== Normalize ======
+def _name(v) -> str:
+    return (v.get("name") or "") if isinstance(v, dict) else str(v or "")
+
+def _overs_to_balls(o) -> int:
+    try:
+        whole, _, part = str(o).partition(".")
+        return int(whole or 0) * 6 + int(part or 0)
+    except ValueError:
+        return 0
+
+def combine_scorecards(payloads: dict):
+    """Flatten the batting/bowling arrays of many matches into two columnar frames."""
+    bat = {k: [] for k in ("match_id", "match", "innings", "player", "dismissal", "R", "B", "4s", "6s")}
+    bowl = {k: [] for k in ("match_id", "match", "innings", "player", "balls", "M", "R", "W")}
+    for mid, p in payloads.items():
+        if not isinstance(p, dict):
+            continue
+        for inn in p.get("scorecard", []) or p.get("innings", []):
+            inning = inn.get("inning") or inn.get("name", "")
+            for b in inn.get("batting", []):
+                bat["match_id"].append(mid); bat["match"].append(p.get("name", mid)); bat["innings"].append(inning)
+                bat["player"].append(_name(b.get("batsman")))
+                bat["dismissal"].append(b.get("dismissal-text", ""))
+                for k in ("R", "B", "4s", "6s"):
+                    bat[k].append(b.get(k.lower() if k in ("R", "B") else k))
+            for b in inn.get("bowling", []):
+                bowl["match_id"].append(mid); bowl["match"].append(p.get("name", mid)); bowl["innings"].append(inning)
+                bowl["player"].append(_name(b.get("bowler")))
+                bowl["balls"].append(_overs_to_balls(b.get("o", 0)))
+                for k in ("M", "R", "W"):
+                    bowl[k].append(b.get(k.lower()))
+    bat_df, bowl_df = pd.DataFrame(bat), pd.DataFrame(bowl)
+    for df, cols in ((bat_df, ["R", "B", "4s", "6s"]), (bowl_df, ["M", "R", "W"])):
+        for c in cols:
+            df[c] = pd.to_numeric(df[c], errors="coerce").fillna(0).astype(int)
+    return bat_df, bowl_df
+
+def aggregate_players(bat_df: pd.DataFrame, bowl_df: pd.DataFrame):
+    batting = (bat_df.groupby("player", as_index=False)
+                     .agg(Inns=("innings", "count"), R=("R", "sum"), B=("B", "sum"),
+                          Fours=("4s", "sum"), Sixes=("6s", "sum"))
+                     .sort_values("R", ascending=False))
+    batting["SR"] = (batting["R"] * 100 / batting["B"].where(batting["B"] > 0)).round(1)
+    bowling = (bowl_df.groupby("player", as_index=False)
+                      .agg(Inns=("innings", "count"), balls=("balls", "sum"), M=("M", "sum"),
+                           R=("R", "sum"), W=("W", "sum"))
+                      .sort_values(["W", "R"], ascending=[False, True]))
+    bowling.insert(2, "O", bowling["balls"].map(lambda b: f"{b // 6}.{b % 6}"))
+    bowling["Econ"] = (bowling["R"] * 6 / bowling["balls"].where(bowling["balls"] > 0)).round(2)
+    return batting, bowling.drop(columns="balls")
+
+# ====== Views ======
+def _show_single():
+    match_id = st.text_input("Enter Match ID", key="scorecard_match_id")
     if not match_id:
         st.info("Type a Match ID from the Live or Fixtures page.")
         return
     try:
-        data = api_get("/match_info", {"id": match_id})
+        data = api_get("/match_info", {"id": match_id}, priority="scorecard")
         payload = data.get("data", {})
+        search_index().add_scorecard(match_id, payload)
         innings = payload.get("scorecard", []) or payload.get("innings", [])
         if not innings:
             st.warning("No detailed scorecard available for this match.")
@@ -23,4 +98,63 @@ def show_scorecard():
                 st.markdown("**Bowling**")
                 st.dataframe(pd.DataFrame(inn['bowling']), use_container_width=True, hide_index=True)
     except Exception as e:
-        st.error(f"Error fetching scorecard: {e}")
\ No newline at end of file
+        st.error(f"Error fetching scorecard: {e}")
+
+def _match_options() -> dict:
+    try:
+        data = api_get("/matches", {"offset": 0}, priority="results")
+    except Exception:
+        return {}
+    return {m["id"]: m.get("name") or m["id"] for m in data.get("data", []) if m.get("id")}
+
+def _show_compare():
+    options = _match_options()
+    picked = st.multiselect("Select matches", list(options), format_func=lambda i: options.get(i, i))
+    typed = st.text_input("…or paste Match IDs (comma-separated)")
+    ids = list(dict.fromkeys(picked + [t.strip() for t in typed.split(",") if t.strip()]))
+    if len(ids) < 2:
+        st.info("Pick at least two matches to compare.")
+        return
+
+    with st.spinner(f"Fetching {len(ids)} scorecards…"):
+        payloads = fetch_match_infos(ids)
+    for mid, p in payloads.items():
+        if isinstance(p, Exception):
+            st.error(f"Error fetching {options.get(mid, mid)}: {p}")
+
+    # ---------- SIDE-BY-SIDE INNINGS ----------
+    ok = [(mid, p) for mid, p in payloads.items() if isinstance(p, dict)]
+    search = search_index()
+    for mid, p in ok:
+        search.add_scorecard(mid, p)
+    for row in range(0, len(ok), COLS_PER_ROW):
+        for col, (mid, p) in zip(st.columns(COLS_PER_ROW), ok[row:row + COLS_PER_ROW]):
+            with col:
+                st.markdown(f"#### {p.get('name') or options.get(mid, mid)}")
+                st.caption(p.get("status", ""))
+                score = p.get("score", [])
+                if not score:
+                    st.caption("⏳ No innings totals yet")
+                for s in score:
+                    st.markdown(f"**{s.get('inning', '')}:** {s.get('r', '')}/{s.get('w', '')} ({s.get('o', '')} ov)")
+
+    # ---------- AGGREGATED PLAYER FIGURES ----------
+    bat_df, bowl_df = combine_scorecards(dict(ok))
+    if bat_df.empty and bowl_df.empty:
+        st.warning("No detailed scorecards available for these matches.")
+        return
+    batting, bowling = aggregate_players(bat_df, bowl_df)
+    st.markdown("---")
+    st.markdown("**Batting (all selected matches)**")
+    st.dataframe(batting, use_container_width=True, hide_index=True)
+    st.markdown("**Bowling (all selected matches)**")
+    st.dataframe(bowling, use_container_width=True, hide_index=True)
+
+def show_scorecard():
+    st.subheader("📋 Scorecard")
+    mode = st.radio("Mode", ["Single match", "Compare matches"], horizontal=True,
+                    label_visibility="collapsed", key="scorecard_mode")
+    if mode == "Single match":
+        _show_single()
+    else:
+        _show_compare()
@@ -0,0 +1,45 @@
+import time
+import streamlit as st
+from utils import GOLD, GREY
+from name_index import search_index
+
+KIND_ICONS = {"player": "🧢", "team": "🏳️", "match": "🏟️"}
+
+def _jump_u19(dataset_key, tour, mid, team):
+    st.session_state.u19_jump = (dataset_key, tour, mid, team)
+    st.session_state.page = "u19"
+
+def _jump_scorecard(mid):
+    st.session_state.scorecard_mode = "Single match"
+    st.session_state.scorecard_match_id = mid
+    st.session_state.page = "scorecard"
+
+def show_search():
+    st.markdown(f"<h3 style='color:{GOLD};'>🔎 Player & Team Search</h3>", unsafe_allow_html=True)
+    index = search_index()
+    query = st.text_input("Search players, teams or matches", placeholder="e.g. Kohli, Pakistan U19…")
+    if not query:
+        st.caption(f"{len(index)} names indexed from uploaded datasets, live matches and scorecards.")
+        return
+
+    t0 = time.perf_counter()
+    results = index.search(query, limit=10, datasets=st.session_state.get("u19_datasets", set()))
+    st.markdown(f"<div style='color:{GREY};font-size:13px;'>{len(results)} result(s) in "
+                f"{(time.perf_counter() - t0) * 1000:.1f} ms</div>", unsafe_allow_html=True)
+    if not results:
+        st.info("No matching names. Upload a U-19 dataset or open the Live page to grow the index.")
+        return
+
+    for n, r in enumerate(results):
+        st.markdown(f"**{KIND_ICONS.get(r['kind'], '•')} {r['name']}** "
+                    f"<span style='color:{GREY};font-size:12px;'>{r['kind']}</span>", unsafe_allow_html=True)
+        cols = st.columns(3)
+        for j, ref in enumerate(r["refs"][:6]):
+            with cols[j % 3]:
+                if ref[0] == "u19":
+                    _, dataset_key, tour, mid, team = ref
+                    st.button(f"📊 {tour} • {mid} • {team}", key=f"search_{n}_{j}",
+                              on_click=_jump_u19, args=(dataset_key, tour, mid, team))
+                else:
+                    _, mid, name = ref
+                    st.button(f"📋 {name}", key=f"search_{n}_{j}", on_click=_jump_scorecard, args=(mid,))
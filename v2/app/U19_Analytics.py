@@ -1,10 +1,15 @@
 # /v2/app/U19_Analytics.py
 
+import io
 import re
+import uuid
 import numpy as np
 import pandas as pd
-import plotly.express as px
 import streamlit as st
+from datastore import content_key, dataset_store
+from match_index import MatchIndex
+from tables import render_table
+from name_index import search_index
 
 # ======================= THEME =======================
 PRIMARY = "#002B5B"   # Deep navy
@@ -91,14 +96,6 @@ def _inject_css():
         unsafe_allow_html=True,
     )
 
-# Helper: center-aligned HTML table (so Streamlit keeps alignment)
-def _html_table(df: pd.DataFrame, index=False) -> str:
-    return (
-        "<div class='tb-table'>"
-        + df.to_html(index=index, escape=False)
-        + "</div>"
-    )
-
 # ===================== COLUMN NORMALIZATION =====================
 def _normalize_cols(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
@@ -172,12 +169,9 @@ def coarse_type(action: str, btype: str) -> str:
     if re.search(r"(fast|medium|rmf|lmf|pace)", txt): return "Pace"
     return "Other"
 
-# ===================== CACHED READER ============================
-@st.cache_data(show_spinner=False)
-def _read_and_prepare(file) -> pd.DataFrame:
-    df = pd.read_excel(file)
-    df = _normalize_cols(df)
-
+# ===================== READER ============================
+# Prepared frames are shared across sessions through datastore.dataset_store()
+def _coerce(df: pd.DataFrame) -> pd.DataFrame:
     # Numeric coercions
     for c in ["over", "ball", "batsman_runs", "total_runs"]:
         if c in df.columns:
@@ -190,6 +184,174 @@ def _read_and_prepare(file) -> pd.DataFrame:
             df[c] = df[c].astype(str).str.strip()
     return df
 
+def _prepare(df: pd.DataFrame) -> pd.DataFrame:
+    return _coerce(_normalize_cols(df))
+
+def _read_and_prepare(file) -> pd.DataFrame:
+    return _prepare(pd.read_excel(file))
+
+REQUIRED = ["tournament","match_id","batting_team","total_runs","over","ball","batsman","bowler","ball_type"]
+
+# ===================== INCREMENTAL APPEND ========================
+def append_matches(base: pd.DataFrame, index: MatchIndex, new_raw: pd.DataFrame):
+    """Append the matches in ``new_raw`` to a prepared dataset.
+
+    Only the new rows are normalized and typed, onto ``base``'s columns and
+    dtypes: extra columns are dropped and absent ones filled as a blank cell
+    would be. A re-sent match identical to the stored one is skipped; a
+    changed one replaces it. Returns (frame, index, summary) with
+    frame/index unchanged when nothing is new. The returned frame is a new
+    concatenation, so appending still copies the existing rows once.
+    """
+    new = _normalize_cols(new_raw)
+    missing = [c for c in REQUIRED if c not in new.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {missing}")
+    new = _coerce(new.reindex(columns=base.columns))
+    for c in new.columns:
+        if new[c].dtype != base[c].dtype:
+            try:
+                new[c] = new[c].astype(base[c].dtype)
+            except (TypeError, ValueError):
+                pass  # left as read; concat widens the column
+
+    keep, replaced_rows = [], []
+    summary = {"added": 0, "replaced": 0, "unchanged": 0, "rows": 0}
+    for key, group in new.groupby(["tournament", "match_id"], sort=False):
+        if key in index:
+            old = base.iloc[index.rows(*key)].reset_index(drop=True)
+            if old.equals(group.reset_index(drop=True)):
+                summary["unchanged"] += 1
+                continue
+            replaced_rows.append(index.rows(*key))
+            summary["replaced"] += 1
+        else:
+            summary["added"] += 1
+        keep.append(group)
+    if not keep:
+        return base, index, summary
+
+    added = pd.concat(keep, ignore_index=True)
+    summary["rows"] = len(added)  # appended rows always sit at the end of the new frame
+    if not replaced_rows:
+        # common case: positions of existing rows do not move, extend the index in place
+        df = pd.concat([base, added], ignore_index=True)
+        idx = index.copy()
+        idx.add(added, offset=len(base))
+    else:
+        kept = base.drop(base.index[np.concatenate(replaced_rows)])
+        df = pd.concat([kept, added], ignore_index=True)
+        idx = MatchIndex.build(df)
+    return df, idx, summary
+
+class _NotCached(LookupError):
+    """The session's upload is gone from the uploader and from the store."""
+
+def _load_dataset(store, base_key: str, raw, appends: list, holder: str):
+    """Resolve the upload plus this session's appended files to (keys, frame).
+
+    ``raw`` is the uploaded file, or None when only its key is known (the
+    uploader forgets its file whenever another page is shown); the upload
+    is then served from the store, raising ``_NotCached`` if it is gone.
+    ``appends`` holds the store keys of the appended files, each kept in the
+    store as a prepared frame. ``keys`` is the chain from the upload's key
+    to the final dataset's key; ``holder`` leases the appended files and the
+    final dataset. Each append gets a key chained from its parent's, so a
+    dataset evicted from (or never seen by) this process is rebuilt from
+    the nearest ancestor still in the store. If an appended file itself has
+    been dropped, it and everything after it are removed from ``appends``.
+    """
+    def parse():
+        if raw is None:
+            raise _NotCached(base_key)
+        return _read_and_prepare(io.BytesIO(raw))
+
+    keys = [base_key]
+    for file_key in appends:
+        store.acquire(file_key, holder)
+        keys.append(content_key((keys[-1] + file_key).encode()))
+
+    # an entry can drop out of the store (disk cap, missing file), so take the frame itself
+    start, df = 0, None
+    for i in range(len(keys) - 1, 0, -1):
+        df = store.get(keys[i])
+        if df is not None:
+            start = i
+            break
+    key = keys[start]
+    if df is None:
+        df = store.get_or_load(key, parse)
+    for i in range(start + 1, len(keys)):
+        part = store.get(appends[i - 1])
+        if part is None:
+            del appends[i - 1:], keys[i:]
+            break
+        index = store.meta(key, df, MatchIndex.build)
+        df, index, _ = append_matches(df, index, part)
+        store.put(keys[i], df, meta=index)
+        key = keys[i]
+    store.acquire(key, holder)
+    return keys, df
+
+# =========================== CHARTS =============================
+# kind -> (title, x, y, plotly builder, native chart)
+CHART_KINDS = {
+    "phase_runs":  ("Runs by Phase", "phase", "runs", "bar", "bar"),
+    "phase_sr":    ("Strike Rate by Phase", "phase", "SR", "line", "bar"),
+    "over_rr":     ("Run Rate by Over", "over", "RR", "line", "line"),
+    "coarse_runs": ("Runs vs Pace/Spin", "coarse", "R", "bar", "bar"),
+    "coarse_dot":  ("Dot% vs Pace/Spin", "coarse", "Dot%", "bar", "bar"),
+}
+HOVER = {
+    "phase_runs":  "Phase: %{x}<br>Runs: %{y}",
+    "phase_sr":    "Phase: %{x}<br>SR: %{y:.1f}",
+    "over_rr":     "Over: %{x}<br>RR: %{y:.2f}",
+    "coarse_runs": "Type: %{x}<br>Runs: %{y}",
+    "coarse_dot":  "Type: %{x}<br>Dot%: %{y:.1f}%",
+}
+
+def _build_figure(kind: str, data: pd.DataFrame):
+    import plotly.express as px  # deferred: lite mode never needs Plotly
+    title, x, y, chart, _ = CHART_KINDS[kind]
+    margin = dict(l=10,r=10,t=40,b=10)
+    if chart == "bar":
+        fig = px.bar(
+            data, x=x, y=y, text_auto=".1f" if kind == "coarse_dot" else True,
+            title=title,
+            color=x,
+            color_discrete_sequence=[PRIMARY, ACCENT, "#5C7A99"]
+        )
+        fig.update_layout(showlegend=False, margin=margin)
+    else:
+        fig = px.line(
+            data, x=x, y=y, markers=True,
+            title=title,
+            color_discrete_sequence=[ACCENT if kind == "over_rr" else PRIMARY]
+        )
+        fig.update_layout(margin=margin, hovermode="x unified")
+    fig.update_traces(hovertemplate=HOVER[kind])
+    return fig
+
+@st.cache_resource(show_spinner=False, max_entries=256)
+def _figure(kind: str, dataset_key: str, selection: tuple, _data: pd.DataFrame):
+    # (dataset_key, selection) identifies _data, so the frame itself is not hashed.
+    # The Figure object is shared, not copied: st.plotly_chart takes an already
+    # validated Figure as is, whereas a dict would be rebuilt into one every rerun.
+    return _build_figure(kind, _data)
+
+def _show_chart(kind: str, data: pd.DataFrame, ctx: tuple):
+    dataset_key, selection, lite = ctx
+    if lite:
+        title, x, y, _, native = CHART_KINDS[kind]
+        st.caption(f"**{title}**")
+        series = data.set_index(x)[[y]]
+        if native == "bar":
+            st.bar_chart(series, color=PRIMARY)
+        else:
+            st.line_chart(series, color=ACCENT)
+    else:
+        st.plotly_chart(_figure(kind, dataset_key, selection, data), use_container_width=True)
+
 # =========================== MAIN ===============================
 def show_u19_analytics():
     st.set_page_config(page_title="U-19 Analytics", page_icon="📊", layout="wide")
@@ -205,46 +367,148 @@ def show_u19_analytics():
     )
 
     uploaded = st.file_uploader("📂 Upload Excel File", type=["xlsx","xls"])
-    if not uploaded:
-        st.info("👆 Please upload your Women U-19 ball-by-ball Excel.")
+    jump = st.session_state.get("u19_jump")
+    reupload = (f"🔎 Re-upload the Excel with {jump[1]} • {jump[2]} to open this search result." if jump
+                else "👆 Please upload your Women U-19 ball-by-ball Excel.")
+    if uploaded:
+        raw = uploaded.getvalue()
+        base_key = content_key(raw)
+        if st.session_state.get("u19_base") != base_key:
+            st.session_state.u19_base = base_key
+            st.session_state.u19_appends = []   # store keys of the files applied on top of the upload
+            st.session_state.u19_append_done = set()  # hashes of files already appended or already up to date
+            st.session_state.u19_append_msg = None
+    elif st.session_state.get("u19_base"):
+        # the uploader drops its file while another page is shown (e.g. Search);
+        # the prepared dataset is still in the store under this session's keys
+        raw, base_key = None, st.session_state.u19_base
+    else:
+        st.info(reupload)
         return
 
+    appends = st.session_state.u19_appends
+    st.session_state.setdefault("u19_append_n", 0)  # uploader key suffix, bumped per handled file
+    store = dataset_store()
+    # One store lease per session, renewed by every load and moved when the session
+    # switches files; a closed session's lease simply lapses
+    holder = st.session_state.setdefault("u19_holder", uuid.uuid4().hex)
+    appended = list(appends)
     try:
-        df = _read_and_prepare(uploaded)
+        chain, df = _load_dataset(store, base_key, raw, appends, holder)
+    except _NotCached:
+        st.info(reupload)  # a pending jump is kept and applied once the file is back
+        return
     except Exception as e:
         st.error(f"❌ Failed to read Excel: {e}")
         return
+    if len(appends) < len(appended):
+        st.session_state.u19_append_done.difference_update(appended[len(appends):])
+        st.warning(f"⚠️ {len(appended) - len(appends)} appended file(s) are no longer cached; append them again.")
+    dataset_key = chain[-1]
+    # Search shows U-19 names only from datasets this session has loaded
+    loaded = st.session_state.setdefault("u19_datasets", set())
+    loaded.update(chain)
+
+    prev_key = st.session_state.get("u19_dataset")
+    if prev_key and prev_key != dataset_key:
+        store.release(prev_key, holder)
+    st.session_state.u19_dataset = dataset_key
 
     # Checks
-    required = ["tournament","match_id","batting_team","total_runs","over","ball","batsman","bowler","ball_type"]
-    missing = [c for c in required if c not in df.columns]
+    missing = [c for c in REQUIRED if c not in df.columns]
     if missing:
         st.error(f"❌ Missing columns: {missing}")
         return
+    index = store.meta(dataset_key, df, MatchIndex.build)
+    search = search_index()
+    sources = [("u19", k) for k in chain]
+    if not search.covers(sources):
+        # new, rebuilt, or partly forgotten after the store dropped part of the chain
+        search.add_dataset(df, dataset_key)
+        for src in sources:
+            search.seen(src)
+
+    if raw is None:
+        st.success("✅ Showing the Excel uploaded earlier in this session.")
+    else:
+        st.success("✅ File uploaded & parsed successfully!")
+
+    # Append new matches without re-processing the season
+    with st.expander(f"➕ Append new matches ({len(appends)} file(s) appended)"):
+        extra = st.file_uploader("Ball-by-ball Excel for the new match(es)", type=["xlsx","xls"],
+                                 key=f"u19_append_{st.session_state.u19_append_n}")
+        if extra is not None:
+            extra_raw = extra.getvalue()
+            extra_key = content_key(extra_raw)
+            done = st.session_state.u19_append_done
+            if extra_key in done:
+                msg = ("info", "This file is already appended.")
+            else:
+                try:
+                    # the prepared file goes through the store (and its memory budget), not session state
+                    part = store.get_or_load(extra_key, lambda: _read_and_prepare(io.BytesIO(extra_raw)), holder)
+                    new_df, new_index, summary = append_matches(df, index, part)
+                except Exception as e:
+                    store.release(extra_key, holder)
+                    msg = ("error", f"❌ Failed to append: {e}")
+                else:
+                    msg = ("caption", f"Added {summary['added']} match(es), replaced {summary['replaced']}, "
+                                      f"{summary['unchanged']} already up to date.")
+                    done.add(extra_key)
+                    if new_df is not df:
+                        new_key = content_key((dataset_key + extra_key).encode())
+                        store.put(new_key, new_df, meta=new_index, holder=holder)
+                        search.seen(("u19", new_key))
+                        search.add_dataset(new_df.tail(summary["rows"]), new_key)
+                        loaded.add(new_key)
+                        appends.append(extra_key)
+                    else:
+                        store.release(extra_key, holder)
+            # every handled file leaves the widget (new key), so later reruns never re-read it
+            st.session_state.u19_append_msg = msg
+            st.session_state.u19_append_n += 1
+            st.rerun()
+        if st.session_state.get("u19_append_msg"):
+            kind, text = st.session_state.u19_append_msg
+            getattr(st, kind)(text)
+
+    # Jump from the Search page: preselect the filters when this dataset has the match
+    jump = st.session_state.pop("u19_jump", None)
+    if jump:
+        jump_key, tour, mid, team = jump
+        if jump_key in chain and team in index.teams(tour, mid):
+            st.session_state.u19_tour, st.session_state.u19_match, st.session_state.u19_team = tour, mid, team
+        else:
+            st.info(f"🔎 {tour} • {mid} comes from another Excel file. Upload that file, then pick the result in Search again.")
 
-    st.success("✅ File uploaded & parsed successfully!")
+    # Filters (a kept selection that no longer exists falls back to the first option)
+    def _valid(key, options):
+        if st.session_state.get(key) not in options:
+            st.session_state.pop(key, None)
+        return options
 
-    # Filters
     c1, c2, c3 = st.columns(3)
     with c1:
-        tours = sorted(df["tournament"].dropna().unique().tolist())
-        selected_tour = st.selectbox("🏆 Select Tournament", tours)
+        tours = _valid("u19_tour", index.tournaments())
+        selected_tour = st.selectbox("🏆 Select Tournament", tours, key="u19_tour")
     with c2:
-        mids = sorted(df.loc[df["tournament"] == selected_tour, "match_id"].dropna().unique().tolist())
-        selected_match = st.selectbox("🎯 Select Match ID", mids)
+        mids = _valid("u19_match", index.matches(selected_tour))
+        selected_match = st.selectbox("🎯 Select Match ID", mids, key="u19_match")
     with c3:
-        teams = sorted(df.loc[(df["tournament"] == selected_tour) & (df["match_id"] == selected_match),
-                              "batting_team"].dropna().unique().tolist())
-        selected_team = st.selectbox("🏏 Select Batting Team", teams)
+        teams = _valid("u19_team", index.teams(selected_tour, selected_match))
+        selected_team = st.selectbox("🏏 Select Batting Team", teams, key="u19_team")
 
-    dsel = df[(df["tournament"] == selected_tour) &
-              (df["match_id"] == selected_match) &
-              (df["batting_team"] == selected_team)].copy()
+    dmatch = df.iloc[index.rows(selected_tour, selected_match)]
+    dsel = dmatch[dmatch["batting_team"] == selected_team].copy()
 
     if dsel.empty:
         st.warning("⚠️ No data for this selection.")
         return
 
+    lite = st.toggle("⚡ Lite charts", key="u19_lite_charts",
+                     help="Native Streamlit charts: smaller payloads for slow connections.")
+    chart_ctx = (dataset_key, (selected_tour, selected_match, selected_team), lite)
+
     # Legal + Phase
     dsel["is_legal"] = dsel["ball_type"].apply(is_legal)
     dsel["phase"] = dsel["over"].apply(phase_from_over)
@@ -281,25 +545,10 @@ def show_u19_analytics():
         cA, cB, cC = st.columns(3)
 
         with cA:
-            fig1 = px.bar(
-                phase, x="phase", y="runs", text_auto=True,
-                title="Runs by Phase",
-                color="phase",
-                color_discrete_sequence=[PRIMARY, ACCENT, "#5C7A99"]
-            )
-            fig1.update_layout(showlegend=False, margin=dict(l=10,r=10,t=40,b=10))
-            fig1.update_traces(hovertemplate="Phase: %{x}<br>Runs: %{y}")
-            st.plotly_chart(fig1, use_container_width=True)
+            _show_chart("phase_runs", phase, chart_ctx)
 
         with cB:
-            fig2 = px.line(
-                phase, x="phase", y="SR", markers=True,
-                title="Strike Rate by Phase",
-                color_discrete_sequence=[PRIMARY]
-            )
-            fig2.update_layout(margin=dict(l=10,r=10,t=40,b=10), hovermode="x unified")
-            fig2.update_traces(hovertemplate="Phase: %{x}<br>SR: %{y:.1f}")
-            st.plotly_chart(fig2, use_container_width=True)
+            _show_chart("phase_sr", phase, chart_ctx)
 
         with cC:
             # RR by over
@@ -307,14 +556,7 @@ def show_u19_analytics():
                     .agg(B=("is_legal","sum"), R=("total_runs","sum"))
             if not og.empty:
                 og["RR"] = np.where(og["B"]>0, og["R"]/(og["B"]/6), 0.0)
-                fig3 = px.line(
-                    og, x="over", y="RR", markers=True,
-                    title="Run Rate by Over",
-                    color_discrete_sequence=[ACCENT]
-                )
-                fig3.update_layout(margin=dict(l=10,r=10,t=40,b=10), hovermode="x unified")
-                fig3.update_traces(hovertemplate="Over: %{x}<br>RR: %{y:.2f}")
-                st.plotly_chart(fig3, use_container_width=True)
+                _show_chart("over_rr", og, chart_ctx)
 
     st.markdown("---")
 
@@ -342,7 +584,7 @@ def show_u19_analytics():
             st.markdown("<div class='tb-card'><b>Top 5 Batters</b></div>", unsafe_allow_html=True)
 
             table = bat_top.rename(columns={"batsman":"Batsman"})[["Batsman","R","B","Fours","Sixes","SR","Dot%"]]
-            st.markdown(_html_table(table), unsafe_allow_html=True)
+            render_table(table, key="u19_bat_top")
 
     # -------- Bowling --------
     with tab_bowl:
@@ -366,7 +608,7 @@ def show_u19_analytics():
             st.markdown("<div class='tb-card'><b>Top 5 Bowlers</b></div>", unsafe_allow_html=True)
 
             table = bowl_top.rename(columns={"bowler":"Bowler"})[["Bowler","O","R","W","Econ","SR","Dot%"]]
-            st.markdown(_html_table(table), unsafe_allow_html=True)
+            render_table(table, key="u19_bowl_top")
 
             # Pace vs Spin
             dsel["coarse"] = dsel.apply(
@@ -385,25 +627,9 @@ def show_u19_analytics():
                 st.markdown("<div class='tb-card'><b>Pace vs Spin</b></div>", unsafe_allow_html=True)
                 cPS1, cPS2 = st.columns(2)
                 with cPS1:
-                    fig_ps1 = px.bar(
-                        by_coarse, x="coarse", y="R", text_auto=True,
-                        title="Runs vs Pace/Spin",
-                        color="coarse",
-                        color_discrete_sequence=[PRIMARY, ACCENT, "#5C7A99"]
-                    )
-                    fig_ps1.update_layout(showlegend=False, margin=dict(l=10,r=10,t=40,b=10))
-                    fig_ps1.update_traces(hovertemplate="Type: %{x}<br>Runs: %{y}")
-                    st.plotly_chart(fig_ps1, use_container_width=True)
+                    _show_chart("coarse_runs", by_coarse, chart_ctx)
                 with cPS2:
-                    fig_ps2 = px.bar(
-                        by_coarse, x="coarse", y="Dot%", text_auto=".1f",
-                        title="Dot% vs Pace/Spin",
-                        color="coarse",
-                        color_discrete_sequence=[PRIMARY, ACCENT, "#5C7A99"]
-                    )
-                    fig_ps2.update_layout(showlegend=False, margin=dict(l=10,r=10,t=40,b=10))
-                    fig_ps2.update_traces(hovertemplate="Type: %{x}<br>Dot%: %{y:.1f}%")
-                    st.plotly_chart(fig_ps2, use_container_width=True)
+                    _show_chart("coarse_dot", by_coarse, chart_ctx)
 
             # Bowling Action (top 10)
             actions = (
@@ -420,7 +646,7 @@ def show_u19_analytics():
                 actions["Dot%"] = np.where(actions["B"]>0, actions["Dots"]*100/actions["B"], 0.0)
                 st.markdown("<div class='tb-card'><b>Bowling Action Breakdown (Top 10)</b></div>", unsafe_allow_html=True)
                 table = actions.rename(columns={"bowling_action":"Action"})[["Action","B","R","SR","Dot%"]]
-                st.markdown(_html_table(table), unsafe_allow_html=True)
+                render_table(table, key="u19_actions")
 
     # -------- Match-ups --------
     with tab_matchups:
@@ -443,9 +669,9 @@ def show_u19_analytics():
             else:
                 pair["SR"] = np.where(pair["B"]>0, pair["R"]*100/pair["B"], 0.0)
                 pair["Dot%"] = np.where(pair["B"]>0, pair["Dots"]*100/pair["B"], 0.0)
-                show = pair.sort_values(["R","SR"], ascending=[False, False]).head(30)
+                show = pair.sort_values(["R","SR"], ascending=[False, False])
                 show = show.rename(columns={"batsman":"Batsman","bowler":"Bowler"})
-                st.markdown(_html_table(show), unsafe_allow_html=True)
+                render_table(show, key="u19_mu_pair")
 
         # Batter vs Bowling Action
         with mu_tabs[1]:
@@ -466,9 +692,9 @@ def show_u19_analytics():
                 else:
                     act["SR"] = np.where(act["B"]>0, act["R"]*100/act["B"], 0.0)
                     act["Dot%"] = np.where(act["B"]>0, act["Dots"]*100/act["B"], 0.0)
-                    show = act.sort_values(["R","SR"], ascending=[False, False]).head(30)
+                    show = act.sort_values(["R","SR"], ascending=[False, False])
                     show = show.rename(columns={"batsman":"Batsman","bowling_action":"Action"})
-                    st.markdown(_html_table(show), unsafe_allow_html=True)
+                    render_table(show, key="u19_mu_action")
 
         # Bowler vs Batting Style (RHB/LHB)
         with mu_tabs[2]:
@@ -491,7 +717,7 @@ def show_u19_analytics():
                     vs_style["Dot%"] = np.where(vs_style["B"]>0, vs_style["Dots"]*100/vs_style["B"], 0.0)
                     vs_style["SR(balls/w)"] = np.where(vs_style["W"]>0, vs_style["B"]/vs_style["W"], np.nan)
                     show = vs_style.rename(columns={"bowler":"Bowler","bat_style":"Vs Style"})
-                    st.markdown(_html_table(show), unsafe_allow_html=True)
+                    render_table(show, key="u19_mu_style")
 
     # ============== Analyst Insights ==============
     st.markdown("<h4 class='tb-h4'>🧠 Analyst Insights</h4>", unsafe_allow_html=True)
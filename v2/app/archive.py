@@ -0,0 +1,234 @@
+# /v2/app/archive.py
+"""Append-only, compressed archive of /matches snapshots.
+
+Snapshots go to hourly segments (``live-YYYYMMDD-HH.jsonl.gz``). Every
+snapshot is written as its own gzip member, so the byte offset recorded in
+the segment's index (``live-YYYYMMDD-HH.idx``) next to its timestamp is
+enough to read it back without decompressing the rest of the segment.
+
+Replicas on one host may share the directory: appends hold an exclusive
+file lock on the segment, unchanged snapshots are skipped whichever replica
+archived the previous one, and readers pick up other replicas' snapshots
+from the index files. Segments older than the retention period are deleted.
+"""
+
+import bisect
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import lru_cache
+
+import streamlit as st
+from utils import setting
+
+try:
+    import fcntl
+except ImportError:  # Windows: one writer per archive directory
+    fcntl = None
+
+SEGMENT_FMT = "live-%Y%m%d-%H"
+DATA_EXT = ".jsonl.gz"
+INDEX_EXT = ".idx"
+READ_CACHE = 16
+REFRESH_EVERY = 2.0  # seconds between scans for other replicas' snapshots
+
+
+# Read on first use rather than at import, like utils.api_key()
+@lru_cache(maxsize=None)
+def archive_dir() -> str:
+    return os.path.expanduser(setting("ARCHIVE_DIR", os.path.join("~", ".talkingbat", "archive")))
+
+
+@lru_cache(maxsize=None)
+def archive_enabled() -> bool:
+    return setting("ARCHIVE_LIVE", "1") != "0"
+
+
+@lru_cache(maxsize=None)
+def archive_retention_hours() -> float:
+    return float(setting("ARCHIVE_RETENTION_HOURS", "48"))
+
+
+@contextmanager
+def _locked(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class SnapshotArchive:
+    def __init__(self, root: str, retention_hours: float = None):
+        self.root = root
+        self.retention = retention_hours * 3600 if retention_hours else None
+        self._segments = {}       # segment -> [(ts, segment, offset, digest)]
+        self._parsed = {}         # segment -> bytes of its index already parsed
+        self._index = []          # all entries in time order
+        self._times = []          # timestamps of _index, for bisect
+        self._checked = 0.0
+        self._last_obj = None
+        self._reads = OrderedDict()  # (segment, offset) -> matches
+        self._lock = threading.Lock()
+        with self._lock:
+            self._refresh(force=True)
+
+    def _path(self, segment: str, ext: str) -> str:
+        return os.path.join(self.root, segment + ext)
+
+    # ---------- index ----------
+    def _read_index(self, segment: str) -> bool:
+        """Parse lines appended to ``segment``'s index since the last call; True if any."""
+        try:
+            with open(self._path(segment, INDEX_EXT), "rb") as f:
+                f.seek(self._parsed.get(segment, 0))
+                data = f.read()
+        except FileNotFoundError:
+            return False
+        end = data.rfind(b"\n") + 1  # a line still being written is left for next time
+        if not end:
+            return False
+        self._parsed[segment] = self._parsed.get(segment, 0) + end
+        entries = self._segments.setdefault(segment, [])
+        for line in data[:end].splitlines():
+            try:
+                e = json.loads(line)
+                entries.append((e["ts"], segment, e["offset"], e.get("digest")))
+            except (ValueError, KeyError):
+                continue
+        return True
+
+    def _refresh(self, force: bool = False):
+        """Pick up snapshots archived by other replicas and forget deleted segments."""
+        now = time.monotonic()
+        if not force and now - self._checked < REFRESH_EVERY:
+            return
+        self._checked = now
+        try:
+            present = {n[:-len(INDEX_EXT)] for n in os.listdir(self.root) if n.endswith(INDEX_EXT)}
+        except FileNotFoundError:
+            present = set()
+        changed = False
+        for segment in [s for s in self._segments if s not in present]:
+            del self._segments[segment]
+            self._parsed.pop(segment, None)
+            changed = True
+        for segment in present:
+            changed |= self._read_index(segment)
+        if changed:
+            self._index = sorted(e for entries in self._segments.values() for e in entries)
+            self._times = [e[0] for e in self._index]
+
+    def _prune(self, now_ts: float):
+        if self.retention is None:
+            return
+        for segment in list(self._segments):
+            try:
+                start = datetime.strptime(segment, SEGMENT_FMT).replace(tzinfo=timezone.utc).timestamp()
+            except ValueError:
+                continue
+            if start + 3600 < now_ts - self.retention:
+                for ext in (INDEX_EXT, DATA_EXT):  # index first: readers stop listing it
+                    try:
+                        os.remove(self._path(segment, ext))
+                    except OSError:
+                        pass
+
+    # ---------- write ----------
+    def append(self, matches: list, ts: float = None) -> bool:
+        """Archive ``matches`` unless it equals the latest archived snapshot."""
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            if matches is self._last_obj:
+                return False
+            self._last_obj = matches
+            body = json.dumps(matches, separators=(",", ":"), sort_keys=True)
+            digest = hashlib.sha1(body.encode("utf-8")).hexdigest()
+            body = f'{{"ts":{ts!r},"matches":{body}}}'
+
+            os.makedirs(self.root, exist_ok=True)
+            segment = datetime.fromtimestamp(ts, timezone.utc).strftime(SEGMENT_FMT)
+            new_segment = segment not in self._segments
+            with open(self._path(segment, DATA_EXT), "ab") as f, _locked(f):
+                # under the segment lock: another replica may have archived this snapshot already
+                self._refresh(force=True)
+                if self._index and self._index[-1][3] == digest:
+                    return False
+                f.seek(0, os.SEEK_END)
+                offset = f.tell()
+                f.write(gzip.compress((body + "\n").encode("utf-8")))
+                f.flush()
+                with open(self._path(segment, INDEX_EXT), "a", encoding="utf-8") as ix:
+                    ix.write(json.dumps({"ts": ts, "offset": offset, "digest": digest}) + "\n")
+            self._refresh(force=True)
+            if new_segment:
+                self._prune(ts)
+            return True
+
+    # ---------- read ----------
+    def span(self):
+        with self._lock:
+            self._refresh()
+            if not self._index:
+                return None
+            return self._index[0][0], self._index[-1][0]
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._index)
+
+    def _read(self, segment: str, offset: int):
+        """Snapshot at ``offset`` in ``segment``, or None if it is gone or torn."""
+        key = (segment, offset)
+        if key in self._reads:
+            self._reads.move_to_end(key)
+            return self._reads[key]
+        try:
+            with open(self._path(segment, DATA_EXT), "rb") as f:
+                f.seek(offset)
+                with gzip.GzipFile(fileobj=f) as gz:
+                    matches = json.loads(gz.readline())["matches"]
+        except (OSError, EOFError, ValueError, KeyError):  # incl. gzip.BadGzipFile
+            return None
+        self._reads[key] = matches
+        if len(self._reads) > READ_CACHE:
+            self._reads.popitem(last=False)
+        return matches
+
+    def at(self, ts: float):
+        """Latest readable snapshot taken at or before ``ts`` as (snapshot_ts, matches), else None."""
+        with self._lock:
+            self._refresh()
+            i = bisect.bisect_right(self._times, ts) - 1
+            for snap_ts, segment, offset, _ in reversed(self._index[max(0, i - READ_CACHE + 1):i + 1]):
+                matches = self._read(segment, offset)
+                if matches is not None:
+                    return snap_ts, matches
+            return None
+
+
+class Replay:
+    """Maps wall-clock time onto archive time at ``speed`` x."""
+
+    def __init__(self, start_ts: float, speed: float, wall0: float = None):
+        self.start_ts = start_ts
+        self.speed = speed
+        self.wall0 = time.time() if wall0 is None else wall0
+
+    def now(self, wall: float = None) -> float:
+        wall = time.time() if wall is None else wall
+        return self.start_ts + (wall - self.wall0) * self.speed
+
+
+@st.cache_resource(show_spinner=False)
+def snapshot_archive() -> SnapshotArchive:
+    return SnapshotArchive(archive_dir(), archive_retention_hours())
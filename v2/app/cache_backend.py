@@ -0,0 +1,155 @@
+# /v2/app/cache_backend.py
+"""Pluggable cache backends shared by the API scheduler and the dataset store.
+
+``MemoryBackend`` keeps everything in this process. ``SQLiteBackend`` keeps
+values and refresh locks in one SQLite file, so every replica on the host
+(or on a shared volume) sees the same cached payloads, and only the replica
+holding a key's lock refreshes it.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+
+class CacheBackend:
+    """Timestamped key/value store with per-key refresh locks."""
+
+    def get(self, key: str):
+        """Return (stored_at, value) or None (also when the backend is too busy to answer)."""
+        raise NotImplementedError
+
+    def set(self, key: str, value, stored_at: float = None):
+        raise NotImplementedError
+
+    def try_lock(self, key: str, ttl: float) -> bool:
+        """Take the refresh lock for ``key`` unless someone else holds it; expires after ``ttl`` s.
+
+        Returns True when taken, False when someone else holds it, and None
+        when the backend is too busy to tell. Never raises.
+        """
+        raise NotImplementedError
+
+    def unlock(self, key: str):
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._data = {}   # key -> (stored_at, value)
+        self._locks = {}  # key -> (owner thread id, expires)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            return self._data.get(key)
+
+    def set(self, key, value, stored_at=None):
+        with self._lock:
+            self._data[key] = (time.time() if stored_at is None else stored_at, value)
+            if len(self._data) > self.max_entries:
+                del self._data[min(self._data, key=lambda k: self._data[k][0])]
+
+    def try_lock(self, key, ttl):
+        now = time.time()
+        with self._lock:
+            held = self._locks.get(key)
+            if held and held[1] > now and held[0] != threading.get_ident():
+                return False
+            self._locks[key] = (threading.get_ident(), now + ttl)
+            return True
+
+    def unlock(self, key):
+        with self._lock:
+            held = self._locks.get(key)
+            if held and held[0] == threading.get_ident():
+                del self._locks[key]
+
+
+class SQLiteBackend(CacheBackend):
+    MAX_AGE = 86400  # rows older than a day are pruned
+    PRUNE_EVERY = 200
+
+    def __init__(self, path: str, timeout: float = 10):
+        self.path = path
+        self.timeout = timeout  # seconds to wait on another writer before giving up
+        self._owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._local = threading.local()
+        self._writes = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._conn() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, stored_at REAL, value TEXT)")
+            db.execute("CREATE TABLE IF NOT EXISTS locks (key TEXT PRIMARY KEY, owner TEXT, expires REAL)")
+
+    def _conn(self) -> sqlite3.Connection:
+        # one connection per thread; WAL lets readers proceed while another process writes
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def _owner_id(self) -> str:
+        return f"{self._owner}:{threading.get_ident()}"
+
+    # A database busy past the timeout reads as a miss and drops the write:
+    # the cache is an optimisation, so it must never turn into a page error.
+    def get(self, key):
+        try:
+            row = self._conn().execute("SELECT stored_at, value FROM cache WHERE key = ?", (key,)).fetchone()
+        except sqlite3.OperationalError:
+            return None
+        return (row[0], json.loads(row[1])) if row else None
+
+    def set(self, key, value, stored_at=None):
+        now = time.time()
+        db = self._conn()
+        try:
+            db.execute("INSERT OR REPLACE INTO cache (key, stored_at, value) VALUES (?, ?, ?)",
+                       (key, now if stored_at is None else stored_at, json.dumps(value, separators=(",", ":"))))
+            self._writes += 1
+            if self._writes % self.PRUNE_EVERY == 0:
+                db.execute("DELETE FROM cache WHERE stored_at < ?", (now - self.MAX_AGE,))
+        except sqlite3.OperationalError:
+            pass
+
+    def try_lock(self, key, ttl):
+        now = time.time()
+        db = self._conn()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError:
+            return None  # database busy past the timeout: not acquired, holder unknown
+        try:
+            db.execute("DELETE FROM locks WHERE key = ? AND (expires < ? OR owner = ?)",
+                       (key, now, self._owner_id()))
+            cur = db.execute("INSERT OR IGNORE INTO locks (key, owner, expires) VALUES (?, ?, ?)",
+                             (key, self._owner_id(), now + ttl))
+            db.execute("COMMIT")
+        except sqlite3.OperationalError:
+            db.execute("ROLLBACK")
+            return None
+        return cur.rowcount == 1
+
+    def unlock(self, key):
+        try:
+            self._conn().execute("DELETE FROM locks WHERE key = ? AND owner = ?", (key, self._owner_id()))
+        except sqlite3.OperationalError:
+            pass  # busy: the lock runs out on its own after its ttl
+
+
+BACKENDS = {"memory": lambda path: MemoryBackend(), "sqlite": SQLiteBackend}
+
+
+def make_backend(name: str, path: str) -> CacheBackend:
+    try:
+        return BACKENDS[name.strip().lower()](path)
+    except KeyError:
+        raise ValueError(f"Unknown CACHE_BACKEND {name!r}; expected one of {sorted(BACKENDS)}") from None
@@ -0,0 +1,342 @@
+# /v2/app/datastore.py
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+import streamlit as st
+from cache_backend import MemoryBackend
+from name_index import search_index
+from utils import cache_backend, setting
+
+# ====== Settings ======
+LEASE_SECONDS = 30 * 60  # a session's hold on its dataset, renewed on every rerun
+SPILL_MAX_AGE = 24 * 3600  # stray spill files older than this are removed at startup
+SPILL_EXTS = (".parquet", ".pkl", ".tmp")  # the only files the store ever writes
+LOAD_LOCK_TTL = 120  # seconds one replica may spend parsing an upload for the others
+LOAD_POLL = 0.5
+
+
+def content_key(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+def _frame_bytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def _file_bytes(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+class _Entry:
+    __slots__ = ("key", "frame", "nbytes", "leases", "path", "disk", "meta")
+
+    def __init__(self, key: str, frame: pd.DataFrame, meta=None):
+        self.key = key
+        self.frame = frame
+        self.nbytes = _frame_bytes(frame)
+        self.leases = {}  # holder -> expiry; Streamlit never says when a session ends
+        self.path = None  # on-disk copy, written the first time the frame is evicted
+        self.disk = 0     # its size, remembered so a vanished file still balances the total
+        self.meta = meta  # small derived data (e.g. lookup indexes); stays resident
+
+
+# ====== Dataset Store ======
+class DatasetStore:
+    """Process-wide registry of prepared frames keyed by upload content hash.
+
+    Resident frames are kept under ``budget_bytes``. When the budget is
+    exceeded the least recently used frames are written to ``spill_dir``
+    (Parquet, or pickle when the frame can't be stored as Parquet) and read
+    back transparently on the next access. Frames without a live session
+    lease are evicted before leased ones. On-disk copies are kept under
+    ``disk_bytes``; beyond that the least recently used unleased datasets
+    are dropped entirely, file included.
+
+    With ``shared=True`` the spill directory doubles as a cache between
+    replicas: a new upload is written there right after parsing, and a
+    replica that sees the same content hash reads that file instead of
+    parsing again. The backend's lock ensures one replica parses at a time.
+    """
+
+    def __init__(self, budget_bytes: int, spill_dir: str, backend=None, shared: bool = False,
+                 disk_bytes: int = None, lease_seconds: float = LEASE_SECONDS):
+        self.budget = budget_bytes
+        self.spill_dir = spill_dir
+        self.disk_budget = disk_bytes
+        self.lease_seconds = lease_seconds
+        self.backend = backend
+        self.shared = shared and backend is not None
+        self._entries = OrderedDict()  # key -> _Entry, least recently used first
+        self._resident = 0
+        self._lock = threading.RLock()
+        self._loading = {}  # key -> Lock, so one upload is parsed only once
+        self._disk = 0      # bytes of spill files owned by entries
+        self._on_drop = []  # callbacks taking the key of each dropped dataset
+        self._sweep()
+
+    # ---------- access ----------
+    # ``holder`` takes or renews that session's lease in the same step, so an
+    # entry can't be dropped between being fetched and being leased
+    def get(self, key: str, holder: str = None):
+        with self._lock:
+            e = self._entries.get(key)
+            if e is None:
+                return None
+            if holder is not None:
+                self._lease(e, holder)
+            self._entries.move_to_end(key)
+            if e.frame is None:
+                try:
+                    e.frame = self._read_spill(e.path)
+                except OSError:
+                    # file removed (e.g. capped by another replica): forget it, callers reload
+                    self.drop(key)
+                    return None
+                self._resident += e.nbytes
+                self._evict(keep=key)
+            return e.frame
+
+    def put(self, key: str, frame: pd.DataFrame, meta=None, holder: str = None) -> pd.DataFrame:
+        with self._lock:
+            old = self._entries.pop(key, None)
+            e = _Entry(key, frame, meta)
+            if old is not None:
+                # same key means same content, so the old on-disk copy stays valid
+                e.leases, e.path, e.disk = old.leases, old.path, old.disk
+                e.meta = meta if meta is not None else old.meta
+                if old.frame is not None:
+                    self._resident -= old.nbytes
+            if holder is not None:
+                self._lease(e, holder)
+            self._entries[key] = e
+            self._resident += e.nbytes
+            self._evict(keep=key)
+            return frame
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def meta(self, key: str, frame: pd.DataFrame, build):
+        """Metadata stored with ``key``, built from ``frame`` on first use.
+
+        Built outside the store lock; kept with the entry if it still exists.
+        """
+        with self._lock:
+            e = self._entries.get(key)
+            if e is not None and e.meta is not None:
+                return e.meta
+        meta = build(frame)
+        with self._lock:
+            e = self._entries.get(key)
+            if e is None:
+                return meta
+            if e.meta is None:
+                e.meta = meta
+            return e.meta
+
+    def get_or_load(self, key: str, loader, holder: str = None) -> pd.DataFrame:
+        with self._lock:
+            key_lock = self._loading.setdefault(key, threading.Lock())
+        with key_lock:
+            frame = self.get(key, holder)
+            if frame is None:
+                if self.shared:
+                    frame = self._load_shared(key, loader, holder)
+                else:
+                    frame = self.put(key, loader(), holder=holder)
+        with self._lock:
+            self._loading.pop(key, None)
+        return frame
+
+    def _load_shared(self, key: str, loader, holder: str = None) -> pd.DataFrame:
+        lock_key = f"dataset:{key}"
+        locked = self.backend.try_lock(lock_key, LOAD_LOCK_TTL)
+        try:
+            if locked is False:
+                # another replica is parsing this upload: wait for its file, but only while it
+                # still holds the lock (it writes the file before unlocking, or its lock expires)
+                deadline = time.monotonic() + LOAD_LOCK_TTL
+                while self._spilled_path(key) is None and time.monotonic() < deadline:
+                    time.sleep(LOAD_POLL)
+                    locked = self.backend.try_lock(lock_key, LOAD_LOCK_TTL)
+                    if locked is not False:
+                        break
+            # locked is None: backend too busy to say who holds the lock, so parse here
+            path = self._spilled_path(key)
+            if path is not None:
+                frame = self._read_spill(path)
+            else:
+                frame = loader()
+                path = self._write(key, frame)
+            with self._lock:
+                self.put(key, frame, holder=holder)
+                e = self._entries[key]
+                if e.path is None:
+                    self._own_file(e, path)
+                    self._cap_disk(keep=key)
+            return frame
+        finally:
+            if locked:
+                self.backend.unlock(lock_key)
+
+    def on_drop(self, callback):
+        """Call ``callback(key)`` whenever a dataset leaves the store for good."""
+        self._on_drop.append(callback)
+
+    def drop(self, key: str):
+        """Forget ``key`` and delete its on-disk copy."""
+        with self._lock:
+            e = self._entries.pop(key, None)
+            if e is None:
+                return
+            if e.frame is not None:
+                self._resident -= e.nbytes
+            self._remove_file(e)
+            for callback in self._on_drop:
+                callback(key)
+
+    # ---------- session leases ----------
+    def acquire(self, key: str, holder: str):
+        """Take or renew ``holder``'s lease on ``key``; leases lapse after ``lease_seconds``."""
+        with self._lock:
+            if key in self._entries:
+                self._lease(self._entries[key], holder)
+
+    def release(self, key: str, holder: str):
+        with self._lock:
+            e = self._entries.get(key)
+            if e is not None:
+                e.leases.pop(holder, None)
+
+    def _lease(self, e: _Entry, holder: str):
+        e.leases[holder] = time.time() + self.lease_seconds
+
+    def _leased(self, e: _Entry, now: float) -> bool:
+        for holder in [h for h, exp in e.leases.items() if exp <= now]:
+            del e.leases[holder]
+        return bool(e.leases)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "datasets": len(self._entries),
+                "resident": sum(e.frame is not None for e in self._entries.values()),
+                "resident_mb": self._resident / 2**20,
+                "budget_mb": self.budget / 2**20,
+                "disk_mb": self._disk / 2**20,
+            }
+
+    # ---------- eviction ----------
+    def _evict(self, keep: str):
+        if self._resident <= self.budget:
+            return
+        now = time.time()
+        resident = [e for e in self._entries.values() if e.frame is not None and e.key != keep]
+        # unleased frames go first, each group in LRU order
+        leased = {e.key for e in resident if self._leased(e, now)}
+        for e in [e for e in resident if e.key not in leased] + [e for e in resident if e.key in leased]:
+            if self._resident <= self.budget:
+                break
+            self._spill(e)
+        self._cap_disk(keep=keep)
+
+    def _spill(self, e: _Entry):
+        if e.path is None:
+            self._own_file(e, self._write(e.key, e.frame))
+        e.frame = None
+        self._resident -= e.nbytes
+
+    def _cap_disk(self, keep: str):
+        if self.disk_budget is None or self._disk <= self.disk_budget:
+            return
+        now = time.time()
+        for e in list(self._entries.values()):  # LRU order
+            if self._disk <= self.disk_budget:
+                break
+            if e.key == keep or e.path is None or self._leased(e, now):
+                continue
+            if e.frame is not None:
+                self._remove_file(e)  # still resident: only the copy goes
+            else:
+                self.drop(e.key)
+
+    def _own_file(self, e: _Entry, path: str):
+        e.path, e.disk = path, _file_bytes(path)
+        self._disk += e.disk
+
+    def _remove_file(self, e: _Entry):
+        if e.path is None:
+            return
+        self._disk -= e.disk
+        try:
+            os.remove(e.path)
+        except OSError:
+            pass
+        e.path, e.disk = None, 0
+
+    def _sweep(self):
+        """Delete the store's own files nobody has touched for ``SPILL_MAX_AGE``."""
+        if not os.path.isdir(self.spill_dir):
+            return
+        cutoff = time.time() - SPILL_MAX_AGE
+        for name in os.listdir(self.spill_dir):
+            if not name.endswith(SPILL_EXTS):
+                continue  # the directory may be shared with other programs
+            path = os.path.join(self.spill_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def _write(self, key: str, frame: pd.DataFrame) -> str:
+        # written under a temporary name and renamed, so readers never see a partial file
+        os.makedirs(self.spill_dir, exist_ok=True)
+        base = os.path.join(self.spill_dir, key)
+        tmp = f"{base}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            frame.to_parquet(tmp, index=False)
+            path = base + ".parquet"
+        except (ImportError, ValueError, TypeError):
+            frame.to_pickle(tmp)
+            path = base + ".pkl"
+        os.replace(tmp, path)
+        return path
+
+    def _spilled_path(self, key: str):
+        for ext in (".parquet", ".pkl"):
+            path = os.path.join(self.spill_dir, key + ext)
+            if os.path.exists(path):
+                return path
+        return None
+
+    @staticmethod
+    def _read_spill(path: str) -> pd.DataFrame:
+        if path.endswith(".parquet"):
+            return pd.read_parquet(path)
+        return pd.read_pickle(path)
+
+
+# DATASET_* settings are read on first use, not at import
+@st.cache_resource(show_spinner=False)
+def dataset_store() -> DatasetStore:
+    backend = cache_backend()
+    store = DatasetStore(
+        int(float(setting("DATASET_MEMORY_MB", "512")) * 2**20),
+        setting("DATASET_SPILL_DIR", os.path.join(tempfile.gettempdir(), "talkingbat_datasets")),
+        backend=backend,
+        shared=not isinstance(backend, MemoryBackend),
+        disk_bytes=int(float(setting("DATASET_DISK_MB", "2048")) * 2**20),
+    )
+    store.on_drop(search_index().forget)  # names of a dropped dataset leave the search index too
+    return store
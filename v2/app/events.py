@@ -0,0 +1,104 @@
+# /v2/app/events.py
+"""Change detection over successive /matches snapshots.
+
+``EventStream.ingest`` diffs each match against the previous snapshot and
+records compact events (score, wicket, status, innings) in a bounded ring
+buffer per match; matches that drop out of the feed are forgotten. Readers
+keep the last ``seq`` they saw and ask for what happened since, so the Live
+page (or any future push channel) only has to act on matches that changed.
+"""
+
+import threading
+import time
+from collections import deque
+
+import streamlit as st
+
+EVENTS_PER_MATCH = 20
+
+
+def match_state(m: dict) -> dict:
+    return {
+        "status": m.get("status", ""),
+        "score": [(s.get("inning", ""), s.get("r"), s.get("w"), s.get("o")) for s in m.get("score", [])],
+    }
+
+
+def _num(v) -> float:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def diff_match(old: dict, new: dict) -> list:
+    """Return (kind, text) pairs describing how ``new`` differs from ``old``."""
+    out = []
+    before = {inning: (r, w, o) for inning, r, w, o in old["score"]}
+    for inning, r, w, o in new["score"]:
+        if inning not in before:
+            out.append(("innings", f"New innings: {inning}"))
+            continue
+        pr, pw, _ = before[inning]
+        if _num(w) > _num(pw):
+            out.append(("wicket", f"WICKET! {inning}: {r}/{w} ({o} ov)"))
+        elif _num(r) != _num(pr):
+            out.append(("score", f"{inning}: {r}/{w} ({o} ov), +{_num(r) - _num(pr):g}"))
+    if new["status"] != old["status"]:
+        out.append(("status", new["status"]))
+    return out
+
+
+class EventStream:
+    def __init__(self, per_match: int = EVENTS_PER_MATCH):
+        self.per_match = per_match
+        self.seq = 0
+        self._state = {}       # match_id -> last seen match_state
+        self._events = {}      # match_id -> deque of events, oldest first
+        self._last = None      # last ingested list, to skip re-diffing a cached payload
+        self._lock = threading.Lock()
+
+    def ingest(self, matches: list, ts: float = None) -> list:
+        """Diff a /matches snapshot against the previous one; return the new events."""
+        ts = time.time() if ts is None else ts
+        new_events = []
+        with self._lock:
+            if matches is self._last:
+                return new_events
+            self._last = matches
+            current = {m.get("id") for m in matches}
+            for mid in [mid for mid in self._state if mid not in current]:
+                del self._state[mid]
+                self._events.pop(mid, None)
+            for m in matches:
+                mid = m.get("id")
+                if not mid:
+                    continue
+                state = match_state(m)
+                old = self._state.get(mid)
+                self._state[mid] = state
+                if old is None or old == state:
+                    continue
+                buf = self._events.setdefault(mid, deque(maxlen=self.per_match))
+                for kind, text in diff_match(old, state):
+                    self.seq += 1
+                    ev = {"seq": self.seq, "ts": ts, "match_id": mid,
+                          "match": m.get("name", mid), "kind": kind, "text": text}
+                    buf.append(ev)
+                    new_events.append(ev)
+        return new_events
+
+    def since(self, seq: int, limit: int = None) -> list:
+        """Events newer than ``seq``, newest first."""
+        with self._lock:
+            out = [e for buf in self._events.values() for e in buf if e["seq"] > seq]
+        out.sort(key=lambda e: e["seq"], reverse=True)
+        return out[:limit] if limit else out
+
+    def changed_since(self, seq: int) -> set:
+        return {e["match_id"] for e in self.since(seq)}
+
+
+@st.cache_resource(show_spinner=False)
+def event_stream() -> EventStream:
+    return EventStream()
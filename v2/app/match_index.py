@@ -0,0 +1,50 @@
+# /v2/app/match_index.py
+
+import numpy as np
+import pandas as pd
+
+
+class MatchIndex:
+    """Tournament → match → batting team lookups plus the row positions of each match.
+
+    Built once per dataset and extended in place when matches are appended,
+    so the selectors and the per-match slice never scan the whole season.
+    """
+
+    def __init__(self):
+        self._teams = {}  # tournament -> {match_id -> set(batting teams)}
+        self._rows = {}   # (tournament, match_id) -> np.ndarray of row positions
+
+    @classmethod
+    def build(cls, df: pd.DataFrame) -> "MatchIndex":
+        idx = cls()
+        idx.add(df, offset=0)
+        return idx
+
+    def copy(self) -> "MatchIndex":
+        idx = MatchIndex()
+        idx._teams = {t: {m: set(teams) for m, teams in ms.items()} for t, ms in self._teams.items()}
+        idx._rows = dict(self._rows)  # position arrays are never mutated
+        return idx
+
+    def add(self, df: pd.DataFrame, offset: int):
+        """Index ``df`` whose first row sits at position ``offset`` of the full frame."""
+        for (tour, mid), pos in df.groupby(["tournament", "match_id"], sort=False).indices.items():
+            self._rows[(tour, mid)] = np.asarray(pos) + offset
+            teams = df["batting_team"].iloc[pos].unique().tolist()
+            self._teams.setdefault(tour, {}).setdefault(mid, set()).update(teams)
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self._rows
+
+    def tournaments(self) -> list:
+        return sorted(self._teams)
+
+    def matches(self, tour) -> list:
+        return sorted(self._teams.get(tour, {}))
+
+    def teams(self, tour, mid) -> list:
+        return sorted(self._teams.get(tour, {}).get(mid, ()))
+
+    def rows(self, tour, mid) -> np.ndarray:
+        return self._rows.get((tour, mid), np.empty(0, dtype=int))
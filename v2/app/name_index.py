@@ -0,0 +1,212 @@
+# /v2/app/name_index.py
+"""Typo-tolerant player and team search.
+
+Names are indexed by character trigrams (for misspellings) and by a sorted
+token list (for prefixes, so "kohl" finds "Virat Kohli"). Each name keeps a
+bounded set of references telling the UI where to jump: a U-19 dataset
+selection or a match id from the API. Sources are added incrementally.
+
+The index is shared by every session, but uploaded datasets are private:
+U-19 references carry their dataset key, and ``search`` only returns those
+from datasets the caller has loaded itself. ``forget`` removes a dataset's
+references (and names left without any) once the dataset store drops it.
+"""
+
+import bisect
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+import streamlit as st
+
+MAX_REFS = 40          # references kept per name and source
+MAX_PREFIX_HITS = 200  # token-prefix candidates scanned per query
+MIN_SCORE = 0.3
+_EMPTY = {"", "nan", "none", "null"}
+PLAYER_COLS = ("batsman", "non_striker", "bowler", "player_dismissed")
+
+
+def normalize(name: str) -> str:
+    text = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode()
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", text.lower()).split())
+
+
+def _source(ref: tuple):
+    # U-19 refs are ("u19", dataset_key, ...); everything else comes from the public API
+    return ref[1] if ref[0] == "u19" else None
+
+
+def trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    def __init__(self):
+        self._names = []                  # id -> display name
+        self._kinds = []                  # id -> "player" | "team" | "match"
+        self._grams = []                  # id -> trigram set
+        self._refs = []                   # id -> {source: set of reference tuples}
+        self._ids = {}                    # (normalized name, kind) -> id
+        self._postings = defaultdict(set) # trigram -> ids
+        self._tokens = []                 # sorted (token, id), for prefix lookups
+        self._sources = set()             # dataset keys / payload ids already indexed
+        self._by_source = defaultdict(set)  # ref source -> ids holding its refs
+        self._free = []                   # ids of forgotten names, reused by add()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._names) - len(self._free)
+
+    # ---------- write ----------
+    def add(self, name, kind: str, ref: tuple):
+        norm = normalize(name)
+        if norm in _EMPTY:
+            return
+        with self._lock:
+            i = self._ids.get((norm, kind))
+            if i is None:
+                grams = trigrams(norm)
+                if self._free:
+                    i = self._free.pop()
+                    self._names[i], self._kinds[i], self._grams[i], self._refs[i] = str(name).strip(), kind, grams, {}
+                else:
+                    i = len(self._names)
+                    self._names.append(str(name).strip())
+                    self._kinds.append(kind)
+                    self._grams.append(grams)
+                    self._refs.append({})
+                self._ids[(norm, kind)] = i
+                for g in grams:
+                    self._postings[g].add(i)
+                for tok in norm.split():
+                    bisect.insort(self._tokens, (tok, i))
+            src = _source(ref)
+            refs = self._refs[i].setdefault(src, set())
+            if len(refs) < MAX_REFS:
+                refs.add(ref)
+            self._by_source[src].add(i)
+
+    def seen(self, source) -> bool:
+        """Mark ``source`` as indexed; True if it already was."""
+        with self._lock:
+            if source in self._sources:
+                return True
+            self._sources.add(source)
+            return False
+
+    def covers(self, sources) -> bool:
+        """True if every source in ``sources`` is indexed (and not forgotten since)."""
+        with self._lock:
+            return all(src in self._sources for src in sources)
+
+    def forget(self, dataset_key: str):
+        """Drop a U-19 dataset's references, and names that have none left."""
+        with self._lock:
+            self._sources.discard(("u19", dataset_key))
+            for i in self._by_source.pop(dataset_key, ()):
+                self._refs[i].pop(dataset_key, None)
+                if not self._refs[i]:
+                    self._remove(i)
+
+    def _remove(self, i: int):
+        norm = normalize(self._names[i])
+        del self._ids[(norm, self._kinds[i])]
+        for g in self._grams[i]:
+            self._postings[g].discard(i)
+            if not self._postings[g]:
+                del self._postings[g]
+        for tok in norm.split():
+            pos = bisect.bisect_left(self._tokens, (tok, i))
+            if pos < len(self._tokens) and self._tokens[pos] == (tok, i):
+                del self._tokens[pos]
+        self._names[i], self._grams[i], self._refs[i] = None, set(), {}
+        self._free.append(i)
+
+    def add_dataset(self, df, dataset_key: str):
+        """Index player and team names of a prepared U-19 frame (or appended rows)."""
+        base = ["tournament", "match_id", "batting_team"]
+        for col in PLAYER_COLS:
+            if col in df.columns:
+                for name, tour, mid, team in df[[col] + base].drop_duplicates().itertuples(index=False):
+                    self.add(name, "player", ("u19", dataset_key, tour, mid, team))
+        for col in ("batting_team", "bowling_team"):
+            if col in df.columns:
+                for team, tour, mid, bat in df[[col] + base].drop_duplicates().itertuples(index=False):
+                    self.add(team, "team", ("u19", dataset_key, tour, mid, bat))
+
+    def add_matches(self, matches: list):
+        """Index team and match names from a /matches payload."""
+        for m in matches:
+            mid = m.get("id")
+            if not mid:
+                continue
+            ref = ("match", mid, m.get("name") or mid)
+            self.add(m.get("name"), "match", ref)
+            for t in m.get("teamInfo", []) or []:
+                self.add(t.get("name"), "team", ref)
+            for t in m.get("teams", []) or []:
+                self.add(t, "team", ref)
+
+    def add_scorecard(self, mid: str, payload: dict):
+        """Index player names from a /match_info payload."""
+        ref = ("match", mid, payload.get("name") or mid)
+        for inn in payload.get("scorecard", []) or payload.get("innings", []):
+            for b in inn.get("batting", []):
+                p = b.get("batsman")
+                self.add(p.get("name") if isinstance(p, dict) else p, "player", ref)
+            for b in inn.get("bowling", []):
+                p = b.get("bowler")
+                self.add(p.get("name") if isinstance(p, dict) else p, "player", ref)
+
+    # ---------- read ----------
+    def search(self, query: str, limit: int = 10, datasets=frozenset()) -> list:
+        """Best matches as dicts with name, kind, score and refs.
+
+        Only U-19 references from ``datasets`` (keys the caller has loaded)
+        are returned; names with no visible reference are skipped.
+        """
+        q = normalize(query)
+        if not q:
+            return []
+        qgrams = trigrams(q)
+        with self._lock:
+            counts = defaultdict(int)
+            for g in qgrams:
+                for i in self._postings.get(g, ()):
+                    counts[i] += 1
+            prefixed = set()
+            last = q.split()[-1]
+            pos = bisect.bisect_left(self._tokens, (last, -1))
+            for tok, i in self._tokens[pos:pos + MAX_PREFIX_HITS]:
+                if not tok.startswith(last):
+                    break
+                prefixed.add(i)
+
+            scored = []
+            for i in set(counts) | prefixed:
+                score = 2 * counts.get(i, 0) / (len(qgrams) + len(self._grams[i]))
+                if i in prefixed:
+                    score += 0.5
+                if score >= MIN_SCORE:
+                    scored.append((score, i))
+            scored.sort(key=lambda t: (-t[0], self._names[t[1]]))
+            out = []
+            for score, i in scored:
+                # one reference per target, though a chained dataset may be indexed under several keys
+                refs = {(r[0],) + r[2:] if r[0] == "u19" else r: r
+                        for src, rs in self._refs[i].items() if src is None or src in datasets for r in rs}
+                refs = list(refs.values())
+                if not refs:
+                    continue
+                out.append({"name": self._names[i], "kind": self._kinds[i], "score": round(score, 3),
+                            "refs": sorted(refs, key=str)})
+                if len(out) == limit:
+                    break
+            return out
+
+
+@st.cache_resource(show_spinner=False)
+def search_index() -> NameIndex:
+    return NameIndex()
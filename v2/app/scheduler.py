@@ -0,0 +1,196 @@
+# /v2/app/scheduler.py
+"""Quota-aware scheduling of cricapi requests.
+
+cricapi reports the key's usage in every response (``info.hitsToday`` /
+``info.hitsLimit``). The scheduler spreads what is left of the daily budget
+over the time remaining until the UTC reset, giving Live the largest share,
+and serves cached payloads until a priority's interval has elapsed.
+Concurrent identical requests share a single upstream fetch (and its
+outcome, failures included), and with a shared cache backend so do
+identical requests from other replicas. A failed response is remembered
+for a backoff period, until the UTC reset when the quota is spent, so an
+exhausted key is not asked again on every rerun.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlencode
+
+from cache_backend import MemoryBackend
+
+# Share of the remaining daily hits each priority may spend
+PRIORITY_SHARE = {"live": 0.6, "scorecard": 0.2, "fixtures": 0.1, "results": 0.1}
+# Minimum interval per priority, in multiples of REFRESH_SECONDS
+BASE_FACTOR = {"live": 1, "scorecard": 1, "fixtures": 10, "results": 10}
+# Below this fraction of the daily limit only Live keeps polling
+LOW_WATER = 0.15
+# Hits held back for on-demand scorecard lookups
+RESERVE_HITS = 5
+MAX_CACHED = 256
+QUOTA_KEY = "__quota__"
+FAILED_PREFIX = "__failed__:"  # + key -> [retry_after, failure payload]
+FAILURE_BACKOFF = 60  # minimum seconds before a failed request is sent again
+LOCK_TTL = 30    # seconds a replica may hold a key's refresh lock
+LOCK_WAIT = 10   # seconds to wait for another replica's refresh before fetching anyway
+LOCK_POLL = 0.25
+
+
+class _Flight:
+    """Outcome of one in-flight fetch, handed to every request waiting on it."""
+    __slots__ = ("done", "payload", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.payload = None
+        self.error = None
+
+
+def seconds_to_reset(now: datetime) -> float:
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (tomorrow - now).total_seconds()
+
+
+class QuotaScheduler:
+    def __init__(self, fetch, base_interval: float, backend=None, clock=time.time):
+        self.fetch = fetch              # (path, params) -> payload dict
+        self.base = base_interval
+        self.backend = backend or MemoryBackend(MAX_CACHED)  # key -> (fetched_at, payload)
+        self.clock = clock
+        self.hits_today = None
+        self.hits_limit = None
+        self.fetches = 0
+        self.served = 0                 # requests answered from cache
+        self._inflight = {}             # key -> _Flight of the fetch in progress
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(path: str, params: dict) -> str:
+        return f"{path}?{urlencode(sorted((k, str(v)) for k, v in params.items()))}"
+
+    # ---------- budget ----------
+    def remaining(self):
+        shared = self.backend.get(QUOTA_KEY)  # latest figures seen by any replica
+        if shared:
+            self.hits_today, self.hits_limit = shared[1]
+        if self.hits_today is None or not self.hits_limit:
+            return None
+        return max(0, self.hits_limit - self.hits_today)
+
+    def interval(self, priority: str = "live") -> float:
+        """Seconds a cached payload stays fresh for ``priority``."""
+        base = self.base * BASE_FACTOR.get(priority, 1)
+        remaining = self.remaining()
+        if remaining is None:
+            return base
+        left = seconds_to_reset(datetime.fromtimestamp(self.clock(), timezone.utc))
+        spendable = remaining - (0 if priority == "scorecard" else RESERVE_HITS)
+        if spendable <= 0:
+            return left
+        if priority != "live" and remaining < LOW_WATER * self.hits_limit:
+            return left
+        hits = spendable * PRIORITY_SHARE.get(priority, 0.1)
+        return max(base, left / max(hits, 1.0))
+
+    def _note_quota(self, info):
+        if not isinstance(info, dict):
+            return
+        try:
+            self.hits_today = int(info["hitsToday"])
+            self.hits_limit = int(info["hitsLimit"])
+        except (KeyError, TypeError, ValueError):
+            return
+        self.backend.set(QUOTA_KEY, [self.hits_today, self.hits_limit])
+
+    def status(self) -> dict:
+        remaining = self.remaining()
+        with self._lock:
+            return {
+                "hits_today": self.hits_today,
+                "hits_limit": self.hits_limit,
+                "remaining": remaining,
+                "fetches": self.fetches,
+                "served_from_cache": self.served,
+            }
+
+    # ---------- requests ----------
+    def request(self, path: str, params: dict, priority: str = "live") -> dict:
+        key = self.key(path, params)
+        # backend reads happen outside self._lock, which only guards the in-flight map
+        # and counters, so a slow shared backend never serializes every request
+        while True:
+            cached = self.backend.get(key)
+            if cached and self.clock() - cached[0] < self.interval(priority):
+                with self._lock:
+                    self.served += 1
+                return cached[1]
+            failed = self.backend.get(FAILED_PREFIX + key)
+            if failed and self.clock() < failed[1][0]:
+                # still backing off from a failure: don't spend another hit on it
+                with self._lock:
+                    self.served += 1
+                return cached[1] if cached else failed[1][1]
+            with self._lock:
+                flight = self._inflight.get(key)
+                if flight is None:
+                    flight = self._inflight[key] = _Flight()
+                    break
+            # same request already in flight: take its outcome rather than fetching again
+            if flight.done.wait(timeout=30):
+                return self._outcome(flight, cached)
+
+        try:
+            flight.payload, fetched = self._fetch_once(key, path, params, cached, priority)
+            if fetched:
+                with self._lock:
+                    self.fetches += 1
+        except Exception as e:
+            flight.error = e
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+        return self._outcome(flight, cached)
+
+    @staticmethod
+    def _outcome(flight: _Flight, cached):
+        if flight.error is not None:
+            if cached is None:
+                raise flight.error
+            return cached[1]
+        payload = flight.payload
+        ok = isinstance(payload, dict) and payload.get("status", "success") == "success"
+        if not ok and cached:
+            return cached[1]  # e.g. quota exhausted: stale beats broken
+        return payload
+
+    def _backoff(self, priority: str) -> float:
+        if self.remaining() == 0:
+            return seconds_to_reset(datetime.fromtimestamp(self.clock(), timezone.utc))
+        return max(FAILURE_BACKOFF, self.interval(priority))
+
+    def _fetch_once(self, key: str, path: str, params: dict, cached, priority: str):
+        """Fetch unless another replica is already refreshing ``key``; returns (payload, fetched_here)."""
+        fresh = self.backend.get(key)
+        if fresh and (cached is None or fresh[0] > cached[0]):
+            return fresh[1], False  # refreshed between our cache check and claiming the key
+        if not self.backend.try_lock(key, LOCK_TTL):
+            deadline = time.monotonic() + LOCK_WAIT
+            while time.monotonic() < deadline:
+                time.sleep(LOCK_POLL)
+                fresh = self.backend.get(key)
+                if fresh and (cached is None or fresh[0] > cached[0]):
+                    return fresh[1], False
+            # the lock holder looks stuck: fetch ourselves rather than serve nothing
+        try:
+            payload = self.fetch(path, params)
+            # stored before unlocking, so replicas waiting on the lock find it
+            if isinstance(payload, dict):
+                self._note_quota(payload.get("info"))
+                if payload.get("status", "success") == "success":
+                    self.backend.set(key, payload, self.clock())
+                else:
+                    self.backend.set(FAILED_PREFIX + key, [self.clock() + self._backoff(priority), payload])
+            return payload, True
+        finally:
+            self.backend.unlock(key)
@@ -0,0 +1,83 @@
+# /v2/app/startup.py
+"""Cold-start helpers: background pre-warming and an import-time budget.
+
+Pages import their heavy dependencies lazily. Once the first screen has been
+painted, ``prewarm()`` loads them in a daemon thread so the next page switch
+is fast. ``python startup.py`` measures each page module's cold import time
+in a fresh interpreter and exits non-zero when one exceeds its budget.
+"""
+
+import importlib
+import os
+import subprocess
+import sys
+import threading
+
+# Loaded in the background after first paint
+PREWARM_MODULES = ("requests", "pandas", "numpy", "plotly.express")
+
+# Module -> cold import budget in ms, measured on top of an already imported streamlit
+IMPORT_BUDGET_MS = {
+    "utils": 150,
+    "Live": 200,
+    "Fixtures": 600,
+    "Results": 600,
+    "Scorecard": 600,
+    "U19_Analytics": 1500,
+}
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# ====== Pre-warm ======
+_prewarm_lock = threading.Lock()
+_prewarm_started = False
+
+def _import_all(modules):
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            pass  # the page that needs it will surface the error
+
+def prewarm(modules=PREWARM_MODULES) -> bool:
+    """Import ``modules`` in a daemon thread, once per process."""
+    global _prewarm_started
+    with _prewarm_lock:
+        if _prewarm_started:
+            return False
+        _prewarm_started = True
+    threading.Thread(target=_import_all, args=(modules,), name="tb-prewarm", daemon=True).start()
+    return True
+
+# ====== Import budget ======
+_MEASURE = (
+    "import time, streamlit\n"
+    "t = time.perf_counter()\n"
+    "import {module}\n"
+    "print((time.perf_counter() - t) * 1000)\n"
+)
+
+def measure_import(module: str) -> float:
+    """Cold import time of ``module`` in ms, excluding streamlit itself."""
+    out = subprocess.run(
+        [sys.executable, "-c", _MEASURE.format(module=module)],
+        cwd=APP_DIR, capture_output=True, text=True, check=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+def check_budget(budget=None, scale: float = 1.0) -> list:
+    """Return (module, ms, budget_ms) for every module over its budget."""
+    over = []
+    for module, limit in (budget or IMPORT_BUDGET_MS).items():
+        ms = measure_import(module)
+        print(f"{module:<15} {ms:8.1f} ms  (budget {limit * scale:.0f} ms)")
+        if ms > limit * scale:
+            over.append((module, ms, limit * scale))
+    return over
+
+if __name__ == "__main__":
+    # IMPORT_BUDGET_SCALE loosens the budget on slower machines (e.g. "2" doubles it)
+    over = check_budget(scale=float(os.getenv("IMPORT_BUDGET_SCALE", "1")))
+    for module, ms, limit in over:
+        print(f"❌ {module} imports in {ms:.0f} ms, over its {limit:.0f} ms budget")
+    sys.exit(1 if over else 0)
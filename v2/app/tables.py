@@ -0,0 +1,75 @@
+# /v2/app/tables.py
+
+import math
+import pandas as pd
+import streamlit as st
+
+PAGE_SIZE = 20
+
+# Helper: center-aligned HTML table (styled by the .tb-table CSS of the page)
+def html_table(df: pd.DataFrame, index=False) -> str:
+    return (
+        "<div class='tb-table'>"
+        + df.to_html(index=index, escape=False)
+        + "</div>"
+    )
+
+# ===================== SERVER-SIDE VIEW =====================
+def filter_sort(df: pd.DataFrame, query: str = "", sort_by=None, ascending=True) -> pd.DataFrame:
+    """Case-insensitive substring filter over the text columns, then a stable sort."""
+    q = (query or "").strip().lower()
+    if q:
+        mask = pd.Series(False, index=df.index)
+        for c in df.select_dtypes(include="object").columns:
+            mask |= df[c].astype(str).str.lower().str.contains(q, regex=False, na=False)
+        df = df[mask]
+    if sort_by in df.columns:
+        df = df.sort_values(sort_by, ascending=ascending, kind="mergesort", na_position="last")
+    return df
+
+def page_slice(df: pd.DataFrame, page: int, page_size: int = PAGE_SIZE):
+    """Return (rows on the page, clamped page number, page count)."""
+    pages = max(1, math.ceil(len(df) / page_size))
+    page = min(max(1, int(page)), pages)
+    start = (page - 1) * page_size
+    return df.iloc[start:start + page_size], page, pages
+
+# ======================== RENDERER ==========================
+def render_table(df: pd.DataFrame, key: str, page_size: int = PAGE_SIZE, index=False):
+    """Render ``df`` as a Talking Bat table, sending only the visible page.
+
+    Small tables render as-is. Larger ones get filter / sort / page controls
+    that run on the server, so the HTML sent per rerun is bounded by
+    ``page_size`` rows whatever the size of ``df``.
+    """
+    if len(df) <= page_size:
+        st.markdown(html_table(df, index=index), unsafe_allow_html=True)
+        return
+
+    c1, c2, c3 = st.columns([2, 1.4, 0.6])
+    with c1:
+        query = st.text_input("🔎 Filter", key=f"{key}_q", placeholder="Name, team, action…")
+    with c2:
+        sort_by = st.selectbox("Sort by", ["—"] + [str(c) for c in df.columns], key=f"{key}_sort")
+    with c3:
+        desc = st.toggle("Desc", value=True, key=f"{key}_desc")
+
+    view = filter_sort(df, query, sort_by if sort_by != "—" else None, ascending=not desc)
+    if view.empty:
+        st.info("No rows match the filter.")
+        return
+
+    pages = max(1, math.ceil(len(view) / page_size))
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages  # filter narrowed the result set
+    rows, page, pages = page_slice(view, st.session_state.get(page_key, 1), page_size)
+
+    st.markdown(html_table(rows, index=index), unsafe_allow_html=True)
+    p1, p2 = st.columns([0.75, 0.25])
+    with p1:
+        first = (page - 1) * page_size + 1
+        st.caption(f"Rows {first}–{first + len(rows) - 1} of {len(view)} • Page {page}/{pages}")
+    with p2:
+        st.number_input("Page", min_value=1, max_value=pages, step=1, key=page_key,
+                        label_visibility="collapsed")
@@ -1,9 +1,34 @@
-import os, requests, streamlit as st
+import os, tempfile, streamlit as st
+from functools import lru_cache
+from cache_backend import make_backend
+from scheduler import QuotaScheduler
 
 # ====== Global Settings ======
+def setting(name: str, default: str = "") -> str:
+    """Read a deploy setting from Streamlit secrets, falling back to the environment."""
+    try:
+        return str(st.secrets[name])
+    except (KeyError, FileNotFoundError):  # no such secret, or no secrets.toml at all
+        return os.getenv(name, default)
+
 API_BASE = "https://api.cricapi.com/v1"
-API_KEY = st.secrets.get("CRICKETDATA_API_KEY", os.getenv("CRICKETDATA_API_KEY", ""))
-REFRESH = int(st.secrets.get("REFRESH_SECONDS", os.getenv("REFRESH_SECONDS", "30")))
+
+# Read on first use rather than at import, keeping the Home page's cold start light
+@lru_cache(maxsize=None)
+def api_key() -> str:
+    return setting("CRICKETDATA_API_KEY")
+
+@lru_cache(maxsize=None)
+def refresh_seconds() -> int:
+    return int(setting("REFRESH_SECONDS", "30"))
+
+# CACHE_BACKEND: "memory" caches per process; "sqlite" shares one cache file between replicas
+@st.cache_resource(show_spinner=False)
+def cache_backend():
+    return make_backend(
+        setting("CACHE_BACKEND", "memory"),
+        setting("CACHE_PATH", os.path.join(tempfile.gettempdir(), "talkingbat_cache.sqlite")),
+    )
 
 # ====== Talking Bat Pro UI Colours ======
 NAVY = "#0B3C66"
@@ -13,14 +38,20 @@ GREY = "#6B7280"
 BORDER = "#D7DBE2"
 
 # ====== API Call ======
-def api_get(path: str, params=None):
-    if params is None:
-        params = {}
-    params["apikey"] = API_KEY
-    r = requests.get(f"{API_BASE}{path}", params=params, timeout=20)
+def _fetch(path: str, params: dict):
+    import requests  # deferred: only pages that hit the API pay for it
+    r = requests.get(f"{API_BASE}{path}", params={**params, "apikey": api_key()}, timeout=20)
     r.raise_for_status()
     return r.json()
 
+@st.cache_resource(show_spinner=False)
+def scheduler() -> QuotaScheduler:
+    return QuotaScheduler(_fetch, refresh_seconds(), backend=cache_backend())
+
+def api_get(path: str, params=None, priority: str = "live"):
+    """Quota-aware GET; priority is one of live / scorecard / fixtures / results."""
+    return scheduler().request(path, dict(params or {}), priority)
+
 # ====== CSS ======
 def style_css():
     st.markdown(f"""
@@ -116,8 +147,10 @@ def style_css():
     """, unsafe_allow_html=True)
 
 # ====== Auto Refresh ======
-def auto_refresh():
-    st.markdown(f"<meta http-equiv='refresh' content='{REFRESH}'>", unsafe_allow_html=True)
+def auto_refresh(priority: str = "live"):
+    # Stretches with the API budget: never poll faster than cached data goes stale
+    seconds = int(max(refresh_seconds(), scheduler().interval(priority)))
+    st.markdown(f"<meta http-equiv='refresh' content='{seconds}'>", unsafe_allow_html=True)
 
 # ====== Header ======
 def header():
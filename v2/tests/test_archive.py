@@ -0,0 +1,40 @@
+import os
+
+from archive import SnapshotArchive
+
+
+def test_snapshots_dedupe_and_resolve_by_time(tmp_path):
+    a = SnapshotArchive(str(tmp_path))
+    assert a.append([{"id": 1}], ts=100.0)
+    assert not a.append([{"id": 1}], ts=130.0)
+    assert a.append([{"id": 2}], ts=160.0)
+    assert len(a) == 2 and a.span() == (100.0, 160.0)
+    assert a.at(99.0) is None
+    assert a.at(150.0) == (100.0, [{"id": 1}])
+    assert a.at(1e9) == (160.0, [{"id": 2}])
+
+
+def test_replicas_sharing_a_directory_see_one_copy(tmp_path):
+    a, b = SnapshotArchive(str(tmp_path)), SnapshotArchive(str(tmp_path))
+    assert a.append([{"id": 1}], ts=100.0)
+    assert not b.append([{"id": 1}], ts=101.0)  # already archived by the other replica
+    assert b.append([{"id": 2}], ts=102.0)
+    a._checked = 0  # skip the rescan throttle
+    assert len(a) == 2 and a.at(102.0) == (102.0, [{"id": 2}])
+
+
+def test_torn_segment_falls_back_to_nothing_instead_of_raising(tmp_path):
+    a = SnapshotArchive(str(tmp_path))
+    a.append([{"id": 1}], ts=100.0)
+    segment = next(n for n in os.listdir(tmp_path) if n.endswith(".jsonl.gz"))
+    (tmp_path / segment).write_bytes(b"not gzip")
+    assert SnapshotArchive(str(tmp_path)).at(200.0) is None
+
+
+def test_old_segments_are_pruned(tmp_path):
+    a = SnapshotArchive(str(tmp_path), retention_hours=1)
+    a.append([{"id": 1}], ts=0.0)
+    a.append([{"id": 2}], ts=4 * 3600.0)
+    a._checked = 0
+    assert len(a) == 1 and a.span() == (4 * 3600.0, 4 * 3600.0)
+    assert len(os.listdir(tmp_path)) == 2
@@ -0,0 +1,82 @@
+import multiprocessing as mp
+import os
+import sqlite3
+import time
+
+from cache_backend import SQLiteBackend
+from scheduler import QuotaScheduler
+
+FETCH_SECONDS = 1.0
+
+
+def _replica(db_path, log_path, barrier, results):
+    """One app replica: its own backend and scheduler on the shared cache file."""
+    def fetch(path, params):
+        with open(log_path, "a") as f:
+            f.write(f"{os.getpid()}\n")
+        time.sleep(FETCH_SECONDS)
+        return {"status": "success", "data": [params["offset"]],
+                "info": {"hitsToday": 7, "hitsLimit": 100}}
+
+    sched = QuotaScheduler(fetch, 60, backend=SQLiteBackend(db_path))
+    barrier.wait()
+    results.put(sched.request("/matches", {"offset": 0}, "live"))
+
+
+def _fetch_log(tmp_path):
+    log = tmp_path / "fetches.log"
+    return log.read_text().split() if log.exists() else []
+
+
+def test_replicas_share_one_upstream_fetch(tmp_path):
+    ctx = mp.get_context("fork")
+    barrier, results = ctx.Barrier(2), ctx.Queue()
+    args = (str(tmp_path / "cache.sqlite"), str(tmp_path / "fetches.log"), barrier, results)
+    procs = [ctx.Process(target=_replica, args=args) for _ in range(2)]
+    for p in procs:
+        p.start()
+    payloads = [results.get(timeout=30) for _ in procs]
+    for p in procs:
+        p.join(timeout=30)
+        assert p.exitcode == 0
+
+    assert len(_fetch_log(tmp_path)) == 1
+    assert payloads == [payloads[0]] * 2 and payloads[0]["data"] == [0]
+    # the replica that fetched published the quota for the other one
+    assert SQLiteBackend(str(tmp_path / "cache.sqlite")).get("__quota__")[1] == [7, 100]
+
+
+def test_busy_database_means_lock_not_acquired(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    backend = SQLiteBackend(path, timeout=0.1)
+    writer = sqlite3.connect(path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        assert backend.try_lock("k", 30) is None  # busy: not acquired, holder unknown
+    finally:
+        writer.execute("ROLLBACK")
+    assert backend.try_lock("k", 30) is True
+
+
+def test_lock_is_released_and_expires(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    a, b = SQLiteBackend(path), SQLiteBackend(path)
+    assert a.try_lock("k", 30)
+    assert not b.try_lock("k", 30)
+    a.unlock("k")
+    assert b.try_lock("k", 0.05)
+    time.sleep(0.1)
+    assert a.try_lock("k", 30)
+
+
+def test_busy_database_drops_writes_without_raising(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    backend = SQLiteBackend(path, timeout=0.1)
+    backend.set("k", {"v": 1}, 5.0)
+    writer = sqlite3.connect(path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        backend.set("k", {"v": 2})
+        assert backend.get("k") == (5.0, {"v": 1})  # WAL: readers are not blocked
+    finally:
+        writer.execute("ROLLBACK")
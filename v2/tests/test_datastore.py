@@ -0,0 +1,51 @@
+import threading
+import time
+
+import pandas as pd
+
+from cache_backend import MemoryBackend, SQLiteBackend
+from datastore import DatasetStore
+
+FRAME = pd.DataFrame({"a": range(10)})
+
+
+class BusyBackend(MemoryBackend):
+    def try_lock(self, key, ttl):
+        return None
+
+
+def test_busy_backend_parses_without_waiting(tmp_path):
+    store = DatasetStore(2**30, str(tmp_path), backend=BusyBackend(), shared=True)
+    t0 = time.monotonic()
+    assert store.get_or_load("k", lambda: FRAME).equals(FRAME)
+    assert time.monotonic() - t0 < 1
+
+
+def test_waits_only_while_another_replica_holds_the_lock(tmp_path):
+    db = str(tmp_path / "cache.sqlite")
+    other, held = SQLiteBackend(db), threading.Event()
+
+    def holder():  # locks belong to a thread: take and give up the lock without writing a file
+        other.try_lock("dataset:k", 120)
+        held.set()
+        time.sleep(0.3)
+        other.unlock("dataset:k")
+
+    releaser = threading.Thread(target=holder)
+    releaser.start()
+    held.wait()
+    store = DatasetStore(2**30, str(tmp_path / "spill"), backend=SQLiteBackend(db), shared=True)
+    t0 = time.monotonic()
+    assert store.get_or_load("k", lambda: FRAME).equals(FRAME)
+    assert time.monotonic() - t0 < 5
+    releaser.join()
+
+
+def test_spill_budget_and_sweep_leave_foreign_files_alone(tmp_path):
+    (tmp_path / "notes.txt").write_text("keep")
+    store = DatasetStore(1, str(tmp_path), disk_bytes=1)
+    store.put("a", FRAME.copy(), holder="s1")
+    store.put("b", FRAME.copy())
+    assert "a" in store and store.get("a") is not None  # leased: kept even over the disk cap
+    assert (tmp_path / "notes.txt").exists()
+    assert store.meta("gone", FRAME, len) == 10  # a missing key still gets its metadata built
@@ -0,0 +1,27 @@
+from events import EventStream, diff_match, match_state
+
+
+def _match(status="Live", score=(("A Inning 1", 50, 1, 10),), mid="m1"):
+    return {"id": mid, "name": "A v B", "status": status,
+            "score": [{"inning": i, "r": r, "w": w, "o": o} for i, r, w, o in score]}
+
+
+def test_diff_reports_runs_wickets_innings_and_status():
+    old = match_state(_match())
+    assert diff_match(old, match_state(_match(score=(("A Inning 1", 56, 1, 11),)))) == [
+        ("score", "A Inning 1: 56/1 (11 ov), +6")]
+    assert diff_match(old, match_state(_match(score=(("A Inning 1", 50, 2, 10.2),))))[0][0] == "wicket"
+    new = match_state(_match(status="Innings break",
+                             score=(("A Inning 1", 50, 1, 10), ("B Inning 1", 0, 0, 0))))
+    assert diff_match(old, new) == [("innings", "New innings: B Inning 1"), ("status", "Innings break")]
+    assert diff_match(old, old) == []
+
+
+def test_stream_sequences_events_and_forgets_finished_matches():
+    s = EventStream()
+    s.ingest([_match(), _match(mid="m2")])
+    events = s.ingest([_match(score=(("A Inning 1", 54, 1, 11),)), _match(mid="m2", status="Stumps")])
+    assert [e["seq"] for e in events] == [1, 2]
+    assert s.changed_since(1) == {"m2"}
+    s.ingest([_match(score=(("A Inning 1", 54, 1, 11),))])
+    assert [e["match_id"] for e in s.since(0)] == ["m1"]
@@ -0,0 +1,35 @@
+import pandas as pd
+
+from name_index import NameIndex
+
+
+def _index():
+    ix = NameIndex()
+    df = pd.DataFrame({"batsman": ["Virat Kohli", "Babar Azam"], "tournament": ["T", "T"],
+                       "match_id": ["1", "1"], "batting_team": ["IND", "PAK"], "bowling_team": ["PAK", "IND"]})
+    ix.add_dataset(df, "k1")
+    ix.add_matches([{"id": "m1", "name": "India v Australia", "teams": ["India", "Australia"]}])
+    return ix
+
+
+def test_typos_and_prefixes_find_names():
+    ix = _index()
+    assert ix.search("virat kohly", datasets={"k1"})[0]["name"] == "Virat Kohli"
+    assert ix.search("bab", datasets={"k1"})[0]["name"] == "Babar Azam"
+    assert ix.search("austr")[0]["refs"] == [("match", "m1", "India v Australia")]
+
+
+def test_dataset_names_are_private_to_sessions_that_loaded_them():
+    ix = _index()
+    assert ix.search("kohli") == []
+    assert ix.search("kohli", datasets={"other"}) == []
+    assert ix.search("kohli", datasets={"k1"})[0]["refs"] == [("u19", "k1", "T", "1", "IND")]
+
+
+def test_forget_removes_a_dropped_dataset():
+    ix = _index()
+    size = len(ix)
+    ix.forget("k1")
+    assert ix.search("kohli", datasets={"k1"}) == []
+    assert len(ix) < size and not ix.covers([("u19", "k1")])
+    assert ix.search("india")  # API names stay
@@ -0,0 +1,70 @@
+import threading
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from scheduler import QUOTA_KEY, QuotaScheduler
+
+NOON = datetime(2025, 1, 1, 12, tzinfo=timezone.utc).timestamp()  # 12 h to the UTC reset
+LEFT = 12 * 3600
+
+
+def _sched(hits_today=None, hits_limit=100, fetch=None):
+    s = QuotaScheduler(fetch or (lambda path, params: {}), 30, clock=lambda: NOON)
+    if hits_today is not None:
+        s.backend.set(QUOTA_KEY, [hits_today, hits_limit])
+    return s
+
+
+def test_interval_without_quota_figures_is_the_base_interval():
+    s = _sched()
+    assert s.interval("live") == 30
+    assert s.interval("fixtures") == 300
+
+
+def test_interval_spreads_remaining_hits_until_reset():
+    s = _sched(hits_today=0)
+    # 100 left, 5 held back for scorecards, live gets 60% of the rest
+    assert s.interval("live") == pytest.approx(LEFT / (95 * 0.6))
+    assert s.interval("scorecard") == pytest.approx(LEFT / (100 * 0.2))
+
+
+def test_interval_never_drops_below_the_base():
+    s = _sched(hits_today=0, hits_limit=10**6)
+    assert s.interval("live") == 30
+
+
+def test_low_budget_pauses_everything_but_live():
+    s = _sched(hits_today=90)
+    assert s.interval("fixtures") == LEFT
+    assert s.interval("live") < LEFT
+
+
+def test_scorecard_reserve_outlasts_the_other_priorities():
+    s = _sched(hits_today=80)
+    assert s.interval("live") == pytest.approx(LEFT / (15 * 0.6))
+    assert s.interval("scorecard") == pytest.approx(LEFT / (20 * 0.2))
+    s = _sched(hits_today=96)  # only the reserve is left
+    assert s.interval("live") == LEFT
+
+
+def test_concurrent_failures_share_one_fetch_and_back_off():
+    calls = []
+
+    def fetch(path, params):
+        calls.append(path)
+        time.sleep(0.1)
+        return {"status": "failure", "reason": "hits exceeded", "info": {"hitsToday": 100, "hitsLimit": 100}}
+
+    s = _sched(fetch=fetch)
+    out = []
+    threads = [threading.Thread(target=lambda: out.append(s.request("/matches", {}))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert [p["reason"] for p in out] == ["hits exceeded"] * 5
+    s.request("/matches", {})  # quota spent: backing off until the reset
+    assert len(calls) == 1
@@ -0,0 +1,20 @@
+import pandas as pd
+
+from tables import filter_sort, page_slice
+
+DF = pd.DataFrame({"player": ["Kohli", "Azam", "Root", "kohli jr"], "R": [50, 70, 50, 10]})
+
+
+def test_filter_is_case_insensitive_substring_on_text_columns():
+    assert filter_sort(DF, "KOHLI")["player"].tolist() == ["Kohli", "kohli jr"]
+    assert filter_sort(DF, "50").empty  # numeric columns are not searched
+
+
+def test_sort_is_stable():
+    assert filter_sort(DF, sort_by="R", ascending=False)["player"].tolist() == ["Azam", "Kohli", "Root", "kohli jr"]
+    assert filter_sort(DF, sort_by="missing")["player"].tolist() == DF["player"].tolist()
+
+
+def test_page_slice_clamps_the_page():
+    rows, page, pages = page_slice(DF, 9, page_size=3)
+    assert (page, pages) == (2, 2) and rows["player"].tolist() == ["kohli jr"]
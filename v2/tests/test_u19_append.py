@@ -0,0 +1,48 @@
+import pandas as pd
+
+from match_index import MatchIndex
+from U19_Analytics import _prepare, append_matches
+
+
+def _raw(match_ids, runs=None):
+    n = len(match_ids)
+    return pd.DataFrame({
+        "Tournament": ["T"] * n, "Match ID": match_ids, "Batting Team": ["A"] * n,
+        "Total Runs": runs or [1] * n, "Over": [0] * n, "Ball": list(range(1, n + 1)),
+        "Batsman": ["x"] * n, "Bowler": ["y"] * n, "Ball Type": ["f"] * n, "Batsman Runs": runs or [1] * n,
+    })
+
+
+def _base():
+    df = _prepare(_raw(["1", "1", "2", "2"]))
+    return df, MatchIndex.build(df)
+
+
+def test_new_match_is_appended_and_indexed():
+    base, index = _base()
+    df, idx, summary = append_matches(base, index, _raw(["3", "3"]))
+    assert summary == {"added": 1, "replaced": 0, "unchanged": 0, "rows": 2}
+    assert len(df) == 6 and list(idx.rows("T", "3")) == [4, 5]
+    assert list(index.matches("T")) == ["1", "2"]  # the original index is untouched
+
+
+def test_identical_match_is_skipped_despite_column_order_and_extras():
+    base, index = _base()
+    raw = _raw(["1", "1"])
+    raw["Venue"] = "Lords"
+    df, idx, summary = append_matches(base, index, raw[raw.columns[::-1]])
+    assert summary["unchanged"] == 1 and df is base and idx is index
+
+
+def test_changed_match_replaces_the_stored_one():
+    base, index = _base()
+    df, idx, summary = append_matches(base, index, _raw(["2", "2"], runs=[4, 6]))
+    assert summary["replaced"] == 1 and len(df) == 4
+    assert df.iloc[idx.rows("T", "2")]["total_runs"].tolist() == [4, 6]
+
+
+def test_missing_optional_column_keeps_the_base_dtypes():
+    base, index = _base()
+    df, _, _ = append_matches(base, index, _raw(["3"]).drop(columns="Batsman Runs"))
+    assert df["batsman_runs"].dtype == base["batsman_runs"].dtype
+    assert df["batsman_runs"].tolist()[-1] == 0